@@ -1,16 +1,24 @@
 from llm_integrations.gemini_client import GetGemini
 from llm_integrations.base import APIPlatform
-from mcp.types import ListToolsResult
+from session_pool import SessionPool
+from history import HistoryManager, to_plain
+from cache import DiskCache
+from tracing import trace_query, span, annotate
+from mcp.types import Tool
 from google.genai import types
-from fastmcp import Client
+from fastmcp.exceptions import ToolError
 import logger.config
 import structlog
+import asyncio
 import json
 
 
 class Agent:
 
-    def __init__(self, config_path, prompt_path, logging=False):
+    def __init__(self, config_path, prompt_path, logging=False, sessions: SessionPool = None, llm: APIPlatform = None,
+                 concurrent_tools=False, max_concurrency=4, tool_timeout: float = None,
+                 token_budget: int = None, llm_cache: DiskCache = None, tool_cache: DiskCache = None,
+                 cacheable_tools: set[str] = None):
         try:
             with open(config_path) as f:
                 self.config = json.load(f)
@@ -21,8 +29,22 @@ class Agent:
         except OSError as e:
             raise RuntimeError(f"Could not open config file: {e}")
 
-        self.llm: APIPlatform = GetGemini(prompt_path)
-        self.client = Client(self.config)
+        self.llm: APIPlatform = llm or GetGemini(prompt_path, cache=llm_cache)
+        # Sessions are shared across queries (and across Agents if passed in)
+        self.owns_sessions = sessions is None
+        self.sessions = sessions or SessionPool(self.config)
+        # Concurrent dispatch of the function calls in a single LLM turn
+        self.concurrent_tools = concurrent_tools
+        self.max_concurrency = max_concurrency
+        self.tool_timeout = tool_timeout
+
+        # Estimated token budget for a query's history (None means unbounded)
+        self.token_budget = token_budget
+
+        # Results of read-only tools (annotated readOnlyHint or named here) are cached
+        self.tool_cache = tool_cache
+        self.cacheable_tools = cacheable_tools or set()
+
         self.log = structlog.get_logger()
         self.log.info("MCP host initialised")
 
@@ -37,7 +59,8 @@ class Agent:
         for part in response.parts:
             llm_response.append({
                 "text": part.text,
-                "function_call": part.function_call.model_dump_json() if part.function_call else None,
+                # Serialized by the log writer thread, not here
+                "function_call": part.function_call,
             })
 
         self.log.info(
@@ -59,10 +82,25 @@ class Agent:
         return count
 
 
-    async def process_query(self, query: str) -> str:
+    async def process_query(self, query: str, query_id: str = None) -> str:
         """Process a query using an LLM and available tools"""
 
+        with trace_query(query_id):
+            return await self._process_query(query)
+
+
+    async def _chat(self, messages: list[types.Content], tools: list[Tool]) -> types.Content:
+        with span("llm.chat", messages=len(messages)):
+            response: types.Content = await self.llm.chat(messages, tools)
+
+        self.log_response(response)
+        messages.append(response)
+        return response
+
+
+    async def _process_query(self, query: str) -> str:
         self.call_count = 0
+        stats_before = dict(self.sessions.stats)
 
         output: list[str] = []
         messages: list[types.Content] = [
@@ -73,46 +111,133 @@ class Agent:
             )
         ]
 
-        async with self.client:
-            tools: ListToolsResult = await self.client.list_tools()        
+        history = HistoryManager(self.token_budget) if self.token_budget else None
+
+        with span("mcp.list_tools"):
+            tools: list[Tool] = await self.sessions.list_tools()
 
         # Initial LLM call (tool selection call)
-        response: types.Content = self.llm.chat(messages, tools)
-        self.log_response(response)
-        messages.append(response)
+        response = await self._chat(messages, tools)
 
         # Finish condition: No function calls
         while(self.count_function_calls(response) != 0):
+            tool_calls: list[types.FunctionCall] = []
+
             for part in response.parts:
                 if part.text:
                     output.append(part.text)
 
                 elif part.function_call:
                     tool_call = part.function_call
-                    tool_result = None
-
                     output.append(f"[Calling tool {tool_call.name} with args {tool_call.args}]")
+                    tool_calls.append(tool_call)
 
-                    async with self.client:
-                        tool_result = await self.client.call_tool(
-                            tool_call.name,
-                            tool_call.args,
-                        )
+            if self.concurrent_tools:
+                tool_results = await self.dispatch_concurrent(tool_calls)
+            else:
+                tool_results = [await self.call_tool(tool_call) for tool_call in tool_calls]
 
-                    # Append the function response
-                    function_result = types.Part.from_function_response(
-                        name=tool_call.name,
-                        response={"result": tool_result},
-                    )
-                    messages.append(types.Content(role="user", parts=[function_result]))
+            # Append the function responses in the order the LLM requested them
+            for tool_call, tool_result in zip(tool_calls, tool_results):
+                function_result = types.Part.from_function_response(
+                    name=tool_call.name,
+                    response={"result": tool_result},
+                )
+                messages.append(types.Content(role="user", parts=[function_result]))
+
+            if history:
+                self.log_compaction(history.compact(messages))
 
             # Secondary LLM call (process tool result)
-            response: types.Content = self.llm.chat(messages, tools)
-            self.log_response(response)
-            messages.append(response)
+            response = await self._chat(messages, tools)
 
         for part in response.parts:
             if part.text:
                 output.append(part.text)
 
+        self.log_session_stats(stats_before)
+
         return "\n\n".join(output)
+
+
+    async def call_tool(self, tool_call: types.FunctionCall):
+        """Call a tool and return its result as plain JSON data."""
+        cacheable = self.tool_cache is not None and (
+            tool_call.name in self.cacheable_tools or tool_call.name in self.sessions.read_only
+        )
+
+        with span("mcp.call_tool", tool=tool_call.name):
+            if cacheable:
+                cache_key = self.tool_cache.make_key(tool_call.name, tool_call.args)
+                cached = await self.tool_cache.get(cache_key)
+                annotate(cache_hit=cached is not None)
+                if cached is not None:
+                    return json.loads(cached)
+
+            result = to_plain(await self.sessions.call_tool(tool_call.name, tool_call.args))
+            encoded = json.dumps(result, default=str)
+            annotate(result_bytes=len(encoded))
+
+            if cacheable:
+                await self.tool_cache.set(cache_key, encoded)
+
+            return result
+
+
+    async def dispatch_concurrent(self, tool_calls: list[types.FunctionCall]) -> list:
+        """Run all function calls from one LLM turn together.
+
+        At most `max_concurrency` calls run at once and each is bounded by
+        `tool_timeout`. Tool errors and timeouts are returned as error results
+        so one failing call does not discard the others.
+
+        Returns:
+            list: Tool results in the same order as `tool_calls`.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(tool_call: types.FunctionCall):
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(self.call_tool(tool_call), timeout=self.tool_timeout)
+                except asyncio.TimeoutError:
+                    self.log.warning("tool_timeout", tool=tool_call.name, timeout=self.tool_timeout)
+                    return {"error": f"Tool {tool_call.name} timed out after {self.tool_timeout}s"}
+                except ToolError as e:
+                    return {"error": str(e)}
+
+        tasks = [asyncio.create_task(run(tool_call)) for tool_call in tool_calls]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            # Cancelled or a transport failure: don't leave sibling calls running
+            for task in tasks:
+                task.cancel()
+            raise
+
+
+    def log_compaction(self, report):
+        if report.compacted:
+            self.log.info(
+                "history_compacted",
+                tokens_before=report.tokens_before,
+                tokens_after=report.tokens_after,
+                compacted=report.compacted,
+            )
+
+
+    def log_session_stats(self, stats_before: dict):
+        stats = self.sessions.stats
+        self.log.info(
+            "mcp_session_stats",
+            connects=stats["connects"] - stats_before["connects"],
+            connect_time=stats["connect_time"] - stats_before["connect_time"],
+            tool_calls=stats["calls"] - stats_before["calls"],
+            call_time=stats["call_time"] - stats_before["call_time"],
+        )
+
+
+    async def close(self):
+        """Close the MCP sessions if this Agent created them."""
+        if self.owns_sessions:
+            await self.sessions.close()
@@ -0,0 +1,183 @@
+from agent import Agent
+from session_pool import SessionPool
+from llm_integrations.gemini_client import GetGemini
+from cache import DiskCache
+from datetime import datetime, timezone
+import argparse
+import asyncio
+import json
+import time
+import sys
+import os
+
+
+def load_queries(args):
+    """Yields (id, query) pairs from a JSONL file or the database summary."""
+    if args.summary:
+        with open(args.summary, encoding="utf-8") as f:
+            # database_summary.jsonl is read a line at a time; legacy .json whole
+            repos = (json.loads(line) for line in f if line.strip()) if args.summary.endswith(".jsonl") else json.load(f)
+            for repo in repos:
+                yield repo["full_name"], args.template.format(**repo)
+        return
+
+    with open(args.input, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            yield str(item.get("id", line_number)), item["query"]
+
+
+def completed_ids(output_path):
+    """IDs that already have a successful result, so a restart can skip them."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # A partial line from a crash mid-write
+                continue
+            if result.get("error") is None:
+                done.add(result["id"])
+    return done
+
+
+def write_result(output, row):
+    """Appends one result row, falling back to an error row if it can't be encoded.
+
+    Returns:
+        str | None: The error recorded for the row.
+    """
+    try:
+        line = json.dumps(row, ensure_ascii=False)
+    except (TypeError, ValueError) as e:
+        row = {**row, "response": None, "error": f"Could not encode result: {e}"}
+        line = json.dumps(row, ensure_ascii=False, default=str)
+    output.write(line + "\n")
+    output.flush()
+    return row["error"]
+
+
+async def worker(worker_id, agent, queue, in_flight, output):
+    while True:
+        item = await queue.get()
+        if item is None:
+            queue.task_done()
+            return
+
+        # Always free the slot and mark the item done, or run() waits forever
+        try:
+            query_id, query = item
+            started_at = datetime.now(timezone.utc).isoformat()
+            start = time.perf_counter()
+            response, error = None, None
+
+            try:
+                response = await agent.process_query(query, query_id=query_id)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+
+            try:
+                error = write_result(output, {
+                    "id": query_id,
+                    "query": query,
+                    "response": response,
+                    "error": error,
+                    "worker": worker_id,
+                    "started_at": started_at,
+                    "elapsed": time.perf_counter() - start,
+                })
+            except OSError as e:
+                error = f"Could not write result: {e}"
+
+            print(f"[{worker_id}] {query_id} {'failed' if error else 'done'} in {time.perf_counter() - start:.1f}s")
+        finally:
+            in_flight.release()
+            queue.task_done()
+
+
+async def run(args):
+    config_path = f"agent/mcp_configs/{args.config}.json"
+    prompt_path = f"agent/prompts/{args.prompt}.md" if args.prompt else None
+
+    with open(config_path) as f:
+        sessions = SessionPool(json.load(f))
+
+    llm_cache = None
+    if args.cache_dir:
+        llm_cache = DiskCache(os.path.join(args.cache_dir, "llm.sqlite"), name="llm")
+
+    # Workers share one LLM platform (and its rate limiter) and one session pool
+    llm = GetGemini(prompt_path, cache=llm_cache)
+    agents = [
+        Agent(config_path, prompt_path, sessions=sessions, llm=llm,
+              concurrent_tools=True, token_budget=args.token_budget)
+        for _ in range(args.workers)
+    ]
+
+    done = completed_ids(args.output)
+    queue = asyncio.Queue()
+    # Bounds queries read from the input but not yet written out
+    in_flight = asyncio.Semaphore(max(args.max_in_flight, args.workers))
+
+    start = time.perf_counter()
+    submitted = 0
+
+    with open(args.output, "a", encoding="utf-8") as output:
+        workers = [
+            asyncio.create_task(worker(i, agent, queue, in_flight, output))
+            for i, agent in enumerate(agents)
+        ]
+
+        try:
+            await sessions.connect()
+
+            for query_id, query in load_queries(args):
+                if query_id in done:
+                    continue
+                await in_flight.acquire()
+                await queue.put((query_id, query))
+                submitted += 1
+
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await sessions.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\nProcessed {submitted} queries ({len(done)} skipped) in {elapsed:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queries through a pool of agents.")
+    parser.add_argument("config", help="MCP config name in agent/mcp_configs")
+    parser.add_argument("prompt", nargs="?", help="System prompt name in agent/prompts")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSONL file of {\"id\", \"query\"} objects")
+    source.add_argument("--summary", help="database_summary.jsonl (or legacy .json) to build one query per repo from")
+    parser.add_argument("--template", default="Evaluate the repository {full_name}.",
+                        help="Query template for --summary, formatted with each repo's fields")
+    parser.add_argument("--output", required=True, help="JSONL file results are appended to")
+    parser.add_argument("--workers", type=int, default=4, help="Number of agents")
+    parser.add_argument("--max-in-flight", type=int, default=8,
+                        help="Queries queued or running at once")
+    parser.add_argument("--token-budget", type=int, default=None)
+    parser.add_argument("--cache-dir", default=None, help="Enable the LLM response cache")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    # Workaround for asyncio hanging on event loop close on Windows
+    sys.coinit_flags = 0x0
+    main()
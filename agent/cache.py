@@ -0,0 +1,123 @@
+import structlog
+import threading
+import hashlib
+import sqlite3
+import asyncio
+import json
+import time
+import os
+
+
+class DiskCache:
+    """Content-addressed on-disk cache with TTL and size-based LRU eviction.
+
+    Entries live in a small SQLite file so a cache survives between runs and
+    can be shared by every agent in a process. Lookups and writes run in a
+    worker thread so they never block the event loop.
+
+    Args:
+        path (str): SQLite file to store entries in.
+        name (str, optional): Label used in log events. Defaults to "cache".
+        ttl (float, optional): Seconds an entry stays valid. None never expires.
+        max_bytes (int, optional): Total size of stored values before the least
+            recently used entries are evicted. Defaults to 64 MiB.
+    """
+    def __init__(self, path: str, name: str = "cache", ttl: float = None, max_bytes: int = 64 * 1024 * 1024):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.name = name
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.log = structlog.get_logger()
+
+        # One connection shared by the worker threads, used one at a time
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL, "
+            "size INTEGER NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self.db.commit()
+
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Hash any JSON-compatible parts into a cache key."""
+        encoded = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+    def _record(self, key: str, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.log.info("cache_lookup", cache=self.name, key=key[:16], hit=hit, hits=self.hits, misses=self.misses)
+
+
+    def get_sync(self, key: str) -> str | None:
+        """Blocking `get`, for callers without an event loop."""
+        now = time.time()
+        with self.lock:
+            row = self.db.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+
+            if row and self.ttl is not None and now - row[1] > self.ttl:
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.db.commit()
+                row = None
+
+            if row:
+                self.db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                self.db.commit()
+
+            self._record(key, row is not None)
+        return row[0] if row else None
+
+
+    def set_sync(self, key: str, value: str):
+        """Blocking `set`, for callers without an event loop."""
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, now, len(value.encode("utf-8"))),
+            )
+            # Evict the least recently used entries until the rest fit in max_bytes
+            self.db.execute(
+                "DELETE FROM entries WHERE key IN ("
+                "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS total FROM entries) "
+                "WHERE total > ?)",
+                (self.max_bytes,),
+            )
+            self.db.commit()
+
+
+    async def get(self, key: str) -> str | None:
+        return await asyncio.to_thread(self.get_sync, key)
+
+
+    async def set(self, key: str, value: str):
+        await asyncio.to_thread(self.set_sync, key, value)
+
+
+    def size(self) -> int:
+        """Total bytes of the stored values."""
+        with self.lock:
+            return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM entries")
+            self.db.commit()
+
+
+    def close(self):
+        with self.lock:
+            self.db.close()
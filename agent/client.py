@@ -1,6 +1,8 @@
 from agent import Agent
+from cache import DiskCache
 import asyncio
 import sys
+import os
 
 # Workaround for asyncio hanging on event loop close on Windows
 COINIT_MULTITHREADED = 0x0
@@ -38,17 +40,30 @@ async def main():
     
     print(config_path, prompt_path)
 
+    # Opt-in response and tool-result caching for replaying the same queries
+    llm_cache = tool_cache = None
+    cache_dir = os.getenv("AGENT_CACHE_DIR")
+    if cache_dir:
+        ttl = float(os.getenv("AGENT_CACHE_TTL", "86400"))
+        llm_cache = DiskCache(os.path.join(cache_dir, "llm.sqlite"), name="llm", ttl=ttl)
+        tool_cache = DiskCache(os.path.join(cache_dir, "tools.sqlite"), name="tools", ttl=ttl)
+
     try:
         host = Agent(
             config_path=config_path,
             prompt_path=prompt_path,
             logging=True,
+            llm_cache=llm_cache,
+            tool_cache=tool_cache,
         )
     except Exception as e:
         print(f"Failed to load config: {e}")
         return
 
-    await chat_loop(host)
+    try:
+        await chat_loop(host)
+    finally:
+        await host.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,197 @@
+from llm_integrations.prompt import content_bytes, estimate_tokens
+from google.genai import types
+from dataclasses import dataclass, field
+import json
+
+
+# Fields that carry bulk text rather than facts the model needs to keep
+DEFAULT_DROP_FIELDS = ("plot", "fullplot", "cast", "body", "poster", "tomatoes")
+
+
+def to_plain(value):
+    """Converts an MCP tool result into JSON-compatible data.
+
+    Args:
+        value: A fastmcp CallToolResult, a list of content blocks, or plain data.
+
+    Returns:
+        Structured content when the tool provides it, otherwise the text blocks
+        (decoded when they hold JSON).
+    """
+    structured = getattr(value, "structured_content", None)
+    if structured is not None:
+        return structured
+
+    blocks = getattr(value, "content", value)
+    if isinstance(blocks, list):
+        plain = [_from_text(block.text) if hasattr(block, "text") else _dump(block) for block in blocks]
+        return plain[0] if len(plain) == 1 else plain
+
+    return _dump(value)
+
+
+def _from_text(text: str):
+    if text[:1] in ("{", "["):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+    return text
+
+
+def _dump(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return value
+
+
+@dataclass
+class CompactionReport:
+    """What one `HistoryManager.compact` call removed."""
+    tokens_before: int
+    tokens_after: int
+    compacted: list[dict] = field(default_factory=list)
+
+
+class HistoryManager:
+    """Keeps a query's message history within a token budget.
+
+    When the history grows past `token_budget`, old function responses are
+    trimmed: bulky fields are dropped, long strings and lists are cut short,
+    and each response keeps a reference to the tool and turn it came from.
+    If trimming is not enough they are reduced to the reference alone. The
+    last `keep_recent` model turns are never touched.
+
+    Args:
+        token_budget (int): Estimated token limit for the history.
+        keep_recent (int, optional): Model turns left intact. Defaults to 2.
+        max_field_bytes (int, optional): Longest string kept when trimming. Defaults to 256.
+        max_list_items (int, optional): Longest list kept when trimming. Defaults to 5.
+        drop_fields (tuple[str], optional): Keys removed from trimmed responses.
+    """
+    def __init__(self, token_budget: int, keep_recent: int = 2, max_field_bytes: int = 256,
+                 max_list_items: int = 5, drop_fields: tuple[str] = DEFAULT_DROP_FIELDS):
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.max_field_bytes = max_field_bytes
+        self.max_list_items = max_list_items
+        self.drop_fields = set(drop_fields)
+
+        # Sizes are cached by position so each message is only measured once,
+        # and compaction level per position so nothing is compacted twice
+        self._sizes: list[int] = []
+        self._levels: dict[int, int] = {}
+
+
+    def _measure(self, messages: list[types.Content]) -> int:
+        for content in messages[len(self._sizes):]:
+            self._sizes.append(content_bytes(content))
+        return sum(self._sizes)
+
+
+    def _protected_from(self, messages: list[types.Content]) -> int:
+        """Index of the first message in the last `keep_recent` model turns."""
+        seen = 0
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i].role == "model":
+                seen += 1
+                if seen == self.keep_recent:
+                    return i
+        return 0
+
+
+    def trim(self, value, dropped: set[str]):
+        """Recursively cuts a value down to a compact summary."""
+        if isinstance(value, dict):
+            trimmed = {}
+            for key, item in value.items():
+                if key in self.drop_fields:
+                    dropped.add(key)
+                    continue
+                trimmed[key] = self.trim(item, dropped)
+            return trimmed
+
+        if isinstance(value, list):
+            trimmed = [self.trim(item, dropped) for item in value[:self.max_list_items]]
+            if len(value) > self.max_list_items:
+                trimmed.append(f"[{len(value) - self.max_list_items} more items omitted]")
+            return trimmed
+
+        if isinstance(value, str) and len(value) > self.max_field_bytes:
+            return value[:self.max_field_bytes] + f"...[{len(value) - self.max_field_bytes} more chars]"
+
+        return value
+
+
+    def _compact_part(self, part: types.Part, index: int, level: int, entry: dict) -> types.Part:
+        response = part.function_response
+        previous = response.response or {}
+
+        if previous.get("compacted"):
+            # Already trimmed once; keep the original reference
+            reference = {key: previous[key] for key in ("compacted", "tool", "turn", "original_bytes")}
+        else:
+            reference = {
+                "compacted": True,
+                "tool": response.name,
+                "turn": index,
+                "original_bytes": len(json.dumps(previous, default=str)),
+            }
+
+        if level == 1:
+            dropped: set[str] = set()
+            reference["summary"] = self.trim(response.response, dropped)
+            entry["dropped_fields"] = sorted(dropped)
+
+        return types.Part.from_function_response(name=response.name, response=reference)
+
+
+    def compact(self, messages: list[types.Content]) -> CompactionReport:
+        """Compact `messages` in place until they fit the budget.
+
+        Returns:
+            CompactionReport: Token estimates and one entry per compacted response.
+        """
+        tokens_before = estimate_tokens(self._measure(messages))
+        report = CompactionReport(tokens_before=tokens_before, tokens_after=tokens_before)
+
+        if tokens_before <= self.token_budget:
+            return report
+
+        protected = self._protected_from(messages)
+        total = sum(self._sizes)
+
+        # Level 1 trims old responses; level 2 reduces them to references
+        for level in (1, 2):
+            for index in range(protected):
+                if estimate_tokens(total) <= self.token_budget:
+                    break
+
+                content = messages[index]
+                if self._levels.get(index, 0) >= level:
+                    continue
+                if not any(part.function_response for part in content.parts or []):
+                    continue
+
+                entry = {
+                    "turn": index,
+                    "level": level,
+                    "tools": [part.function_response.name for part in content.parts if part.function_response],
+                    "bytes_before": self._sizes[index],
+                }
+                parts = [
+                    self._compact_part(part, index, level, entry) if part.function_response else part
+                    for part in content.parts
+                ]
+                messages[index] = types.Content(role=content.role, parts=parts)
+
+                size = content_bytes(messages[index])
+                total += size - self._sizes[index]
+                self._sizes[index] = size
+                self._levels[index] = level
+
+                entry["bytes_after"] = size
+                report.compacted.append(entry)
+
+        report.tokens_after = estimate_tokens(total)
+        return report
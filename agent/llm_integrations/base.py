@@ -1,9 +1,13 @@
 from abc import ABC, abstractmethod
+import asyncio
 
 class APIPlatform(ABC):
-    
+
     @abstractmethod
-    def chat(self, prompt:str) -> str:
-        def chat(self, prompt: str) -> str:
-            """Sends a prompt to the AI and returns the response text."""
-            pass
\ No newline at end of file
+    async def chat(self, messages: list, tools: list):
+        """Sends the conversation to the AI and returns its response."""
+        pass
+
+    def chat_sync(self, messages: list, tools: list):
+        """Blocking wrapper around `chat` for callers without an event loop."""
+        return asyncio.run(self.chat(messages, tools))
@@ -1,40 +1,108 @@
 from .base import APIPlatform
+from .rate_limiter import TokenBucket
+from .prompt import PromptAssembler
 from google import genai
 from google.genai import types
 from mcp.types import Tool
-import time
+from tracing import annotate
+import structlog
 
 class Gemini(APIPlatform):
     """Gemini AI platform for generating text responses.
 
+    A single `genai.Client` is kept for the lifetime of the platform so its
+    HTTP connection pool is reused across calls.
+
+    Responses can be served from an optional `cache` (see agent/cache.py),
+    keyed by the model, system prompt, history and tool schemas.
+
     Args:
         APIPlatform (Class): Base schema for AI platforms.
     """
-    def __init__(self, api_key: str, system_prompt: str = None):
+    def __init__(self, api_key: str, system_prompt: str = None, rate_limiter: TokenBucket = None,
+                 model: str = "gemini-2.5-flash", cache=None):
         super().__init__()
         self.api_key = api_key
         self.system_prompt = system_prompt
-        self.last_prompt_time = 0
+        self.prompt = PromptAssembler(system_prompt)
+        self.model = model
+        self.client = genai.Client(api_key=api_key)
+
+        # At most one request per second unless a shared limiter is given
+        self.rate_limiter = rate_limiter or TokenBucket(rate=1, capacity=1)
+        self.cache = cache
+        self.log = structlog.get_logger()
+
+    def _cache_key(self, contents: list[types.Content], toolsObj: list[Tool]) -> str | None:
+        if not self.cache:
+            return None
+        return self.cache.make_key(
+            self.model,
+            self.system_prompt,
+            [content.model_dump(mode="json", exclude_none=True) for content in contents],
+            [tool.model_dump(mode="json", exclude_none=True) for tool in toolsObj or []],
+        )
 
-    def chat(self, messages: list[types.Content], toolsObj: list[Tool]) -> types.Content:
-        # Sleep until 1 second has elapsed since last chat
-        time.sleep(max(0, 1 - (time.time() - self.last_prompt_time)))
+    def _record(self, response, size, throttle_wait: float) -> types.Content:
+        size.record_usage(response.usage_metadata)
+        self.log.info("llm_payload", model=self.model, **vars(size))
+        annotate(
+            throttle_wait=throttle_wait,
+            payload_bytes=size.system_bytes + size.history_bytes,
+            prompt_tokens=size.prompt_tokens,
+            response_tokens=size.response_tokens,
+        )
+        return response.candidates[0].content
+
+    async def chat(self, messages: list[types.Content], toolsObj: list[Tool]) -> types.Content:
+        contents, config, size = self.prompt.build(messages, toolsObj)
 
-        if self.system_prompt:
-            messages.insert(0, types.Content(
-                role="user",
-                parts=[
-                    types.Part(text=self.system_prompt)],
-            ))
+        cache_key = self._cache_key(contents, toolsObj)
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            annotate(cache_hit=cached is not None)
+            if cached is not None:
+                return types.Content.model_validate_json(cached)
 
-        client = genai.Client()
-        config = genai.types.GenerateContentConfig(tools=toolsObj)
+        throttle_wait = await self.rate_limiter.acquire()
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=messages,
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=contents,
             config=config,
         )
 
-        self.last_prompt_time = time.time()
-        return response.candidates[0].content
+        content = self._record(response, size, throttle_wait)
+        if cache_key:
+            await self.cache.set(cache_key, content.model_dump_json(exclude_none=True))
+
+        return content
+
+    def chat_sync(self, messages: list[types.Content], toolsObj: list[Tool]) -> types.Content:
+        """Blocking `chat` through the synchronous client.
+
+        Running `chat` under `asyncio.run` would tie the aio client's
+        connections to a throwaway loop, so this path never touches it.
+        """
+        contents, config, size = self.prompt.build(messages, toolsObj)
+
+        cache_key = self._cache_key(contents, toolsObj)
+        if cache_key:
+            cached = self.cache.get_sync(cache_key)
+            annotate(cache_hit=cached is not None)
+            if cached is not None:
+                return types.Content.model_validate_json(cached)
+
+        throttle_wait = self.rate_limiter.acquire_sync()
+
+        response = self.client.models.generate_content(
+            model=self.model,
+            contents=contents,
+            config=config,
+        )
+
+        content = self._record(response, size, throttle_wait)
+        if cache_key:
+            self.cache.set_sync(cache_key, content.model_dump_json(exclude_none=True))
+
+        return content
@@ -1,15 +1,27 @@
 import os
 from dotenv import load_dotenv, find_dotenv
 from llm_integrations.gemini import Gemini
+from llm_integrations.rate_limiter import TokenBucket
 
-load_dotenv(find_dotenv())
+# Created on the first GetGemini call, after .env has been loaded.
+# Shared by every Gemini instance so concurrent agents throttle together
+rate_limiter = None
 
-gemini_api_key = os.getenv("GEMINI_API_KEY")
+def shared_rate_limiter():
+    global rate_limiter
+    if rate_limiter is None:
+        rate_limiter = TokenBucket(rate=float(os.getenv("GEMINI_RPS", "1")), capacity=1)
+    return rate_limiter
 
-if not gemini_api_key:
-    raise ValueError("GEMINI_API_KEY environment variable is not set.")
+def GetGemini(prompt_path = None, limiter = None, cache = None):
+    # The key is checked here rather than at import, so code paths that
+    # never call Gemini (scripted runs, --help) don't need it
+    load_dotenv(find_dotenv())
+    gemini_api_key = os.getenv("GEMINI_API_KEY")
+
+    if not gemini_api_key:
+        raise ValueError("GEMINI_API_KEY environment variable is not set.")
 
-def GetGemini(prompt_path = None):
     system_prompt = None
 
     try:
@@ -18,4 +30,5 @@ def GetGemini(prompt_path = None):
     except Exception as e:
         print("System prompt load failed. Error:", e)
 
-    return Gemini(api_key=gemini_api_key, system_prompt=system_prompt)
\ No newline at end of file
+    return Gemini(api_key=gemini_api_key, system_prompt=system_prompt, rate_limiter=limiter or shared_rate_limiter(),
+                  cache=cache)
\ No newline at end of file
@@ -0,0 +1,63 @@
+from google.genai import types
+from mcp.types import Tool
+from dataclasses import dataclass
+
+# Rough chars-per-token ratio used to estimate size before the API reports usage
+BYTES_PER_TOKEN = 4
+
+
+def content_bytes(content: types.Content) -> int:
+    """Serialized size of one message as it is sent to the API."""
+    return len(content.model_dump_json(exclude_none=True).encode("utf-8"))
+
+
+def estimate_tokens(num_bytes: int) -> int:
+    return num_bytes // BYTES_PER_TOKEN
+
+
+@dataclass
+class PayloadSize:
+    """Size of one request, before and after the API reports usage."""
+    messages: int
+    system_bytes: int
+    history_bytes: int
+    estimated_tokens: int
+    prompt_tokens: int | None = None
+    response_tokens: int | None = None
+
+    def record_usage(self, usage: types.GenerateContentResponseUsageMetadata | None):
+        if usage:
+            self.prompt_tokens = usage.prompt_token_count
+            self.response_tokens = usage.candidates_token_count
+
+
+class PromptAssembler:
+    """Builds the request payload for a chat call.
+
+    The system prompt goes out once per request via `system_instruction`
+    rather than being inserted into the history, and the caller's message
+    list is never modified.
+
+    Args:
+        system_prompt (str, optional): System instruction for every request.
+    """
+    def __init__(self, system_prompt: str = None):
+        self.system_prompt = system_prompt
+        self.system_bytes = len(system_prompt.encode("utf-8")) if system_prompt else 0
+
+    def build(self, messages: list[types.Content], tools: list[Tool]) -> tuple[
+            list[types.Content], types.GenerateContentConfig, PayloadSize]:
+        contents = list(messages)
+        config = types.GenerateContentConfig(
+            system_instruction=self.system_prompt,
+            tools=tools,
+        )
+
+        history_bytes = sum(content_bytes(content) for content in contents)
+        size = PayloadSize(
+            messages=len(contents),
+            system_bytes=self.system_bytes,
+            history_bytes=history_bytes,
+            estimated_tokens=estimate_tokens(self.system_bytes + history_bytes),
+        )
+        return contents, config, size
@@ -0,0 +1,79 @@
+import threading
+import asyncio
+import weakref
+import time
+
+
+class TokenBucket:
+    """Non-blocking token-bucket rate limiter.
+
+    One bucket can be shared by every agent in a process so that concurrent
+    queries respect a single request rate without blocking the event loop.
+    The bucket may be used from several event loops (and from blocking code
+    through `acquire_sync`); each loop gets its own asyncio lock, while the
+    token count itself is guarded by a thread lock.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (float, optional): Maximum burst size. Defaults to 1.
+    """
+    def __init__(self, rate: float, capacity: float = 1):
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._state_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        # asyncio.Lock is bound to the loop it is first used on
+        self._loop_locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _take(self, tokens: float) -> float:
+        """Take `tokens` if available; otherwise return the seconds until they are."""
+        with self._state_lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def _loop_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        with self._state_lock:
+            lock = self._loop_locks.get(loop)
+            if lock is None:
+                lock = self._loop_locks[loop] = asyncio.Lock()
+        return lock
+
+    async def acquire(self, tokens: float = 1) -> float:
+        """Wait until `tokens` are available and take them.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        start = time.monotonic()
+
+        # Holding the lock while sleeping serves waiters in arrival order
+        async with self._loop_lock():
+            while (wait := self._take(tokens)) > 0:
+                await asyncio.sleep(wait)
+
+        return time.monotonic() - start
+
+    def acquire_sync(self, tokens: float = 1) -> float:
+        """Blocking `acquire`, for callers without an event loop.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        start = time.monotonic()
+
+        with self._sync_lock:
+            while (wait := self._take(tokens)) > 0:
+                time.sleep(wait)
+
+        return time.monotonic() - start
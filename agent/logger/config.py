@@ -1,24 +1,43 @@
 import logging
 import structlog
+import queue
+import os
 from datetime import datetime
+from logger.pipeline import DictQueueHandler, BatchWriter
 
-# Set up the file handler
+# Pipeline settings
+log_dir = os.getenv("AGENT_LOG_DIR", "logs")
+queue_size = int(os.getenv("AGENT_LOG_QUEUE_SIZE", "10000"))
+queue_policy = os.getenv("AGENT_LOG_POLICY", "drop")          # "drop" or "block" when the queue is full
+max_bytes = int(os.getenv("AGENT_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+backups = int(os.getenv("AGENT_LOG_BACKUPS", "5"))
+compress = os.getenv("AGENT_LOG_COMPRESS", "0") == "1"
+
+# The directory and file are created by the writer on the first record
 timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-log_filename = f"logs/mcp_client_{timestamp}.log"
+log_filename = os.path.join(log_dir, f"mcp_client_{timestamp}.log")
 
-file_handler = logging.FileHandler(log_filename)
-file_handler.setFormatter(logging.Formatter("%(message)s"))
+# Records are queued as dicts and JSON-encoded on a background writer thread,
+# started by the first record and flushed at exit
+log_queue = queue.Queue(maxsize=queue_size)
+queue_handler = DictQueueHandler(log_queue, policy=queue_policy)
+writer = BatchWriter(log_queue, log_filename, queue_handler,
+                     max_bytes=max_bytes, backups=backups, compress=compress)
 
 # Basic logging config
 logging.basicConfig(
     level=logging.INFO,
-    handlers=[file_handler],  # Send logs to file
+    handlers=[queue_handler],  # Send logs to the writer queue
 )
 
+def pass_event_dict(logger, method_name, event_dict):
+    """Hand the event dict to stdlib logging unrendered."""
+    return (event_dict,), {}
+
 # Configure structlog
 structlog.configure(
     processors=[
-        structlog.processors.JSONRenderer()                   # Render as JSON
+        pass_event_dict                                       # Rendered as JSON by the writer
     ],
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),          # Use stdlib logging
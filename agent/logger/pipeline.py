@@ -0,0 +1,235 @@
+import logging.handlers
+import threading
+import atexit
+import queue
+import time
+import json
+import gzip
+import os
+
+
+def to_json(value):
+    """Fallback encoder for objects logged as-is (e.g. pydantic models)."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return str(value)
+
+
+class DictQueueHandler(logging.handlers.QueueHandler):
+    """Queues structlog event dicts without formatting them.
+
+    Encoding happens on the writer thread, so logging from the event loop only
+    costs a queue put, and the writer thread is only started by the first
+    record. When the queue is full, records are either dropped (counted and
+    reported by the writer) or the caller blocks for up to `block_timeout`
+    seconds before dropping.
+
+    Args:
+        log_queue (queue.Queue): Bounded queue shared with a `BatchWriter`.
+        policy (str, optional): "drop" or "block". Defaults to "drop".
+        block_timeout (float, optional): Longest wait under "block". Defaults to 1.
+    """
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop", block_timeout: float = 1.0):
+        super().__init__(log_queue)
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown log queue policy: {policy}")
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        # Set by the BatchWriter draining this queue
+        self.writer = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.writer is not None:
+            self.writer.ensure_started()
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchWriter(threading.Thread):
+    """Background thread that encodes queued records and writes them in batches.
+
+    Files rotate once `max_bytes` of output has been written, keeping
+    `backups` old files as `<path>.1` ... `<path>.N`. With `compress`, output
+    is gzipped and `max_bytes` counts uncompressed bytes.
+
+    Args:
+        log_queue (queue.Queue): Queue fed by a `DictQueueHandler`.
+        path (str): Log file path (".gz" is appended when compressing).
+        handler (DictQueueHandler): Handler whose drop count is reported.
+        batch_size (int, optional): Records written per flush. Defaults to 256.
+        flush_interval (float, optional): Longest delay before a flush. Defaults to 1.
+        max_bytes (int, optional): Rotation size, 0 disables. Defaults to 50 MB.
+        backups (int, optional): Rotated files kept. Defaults to 5.
+        compress (bool, optional): Gzip the output. Defaults to False.
+        stop_timeout (float, optional): Longest wait for the final flush in
+            `stop`. Defaults to 5.
+    """
+    _STOP = object()
+
+    def __init__(self, log_queue: queue.Queue, path: str, handler: DictQueueHandler,
+                 batch_size: int = 256, flush_interval: float = 1.0, max_bytes: int = 50 * 1024 * 1024,
+                 backups: int = 5, compress: bool = False, stop_timeout: float = 5.0):
+        super().__init__(name="log-writer", daemon=True)
+        self.queue = log_queue
+        self.path = path + ".gz" if compress else path
+        self.handler = handler
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self.stop_timeout = stop_timeout
+        handler.writer = self
+
+        self.reported_drops = 0
+        # Bytes lost to failed writes since the last successful one
+        self.failed_bytes = 0
+        self.written = 0
+        # Opened on the first write, so runs that log nothing leave no file
+        self.file = None
+
+        self._start_lock = threading.Lock()
+        self._launched = False
+        self._stopping = threading.Event()
+
+    def ensure_started(self):
+        """Start the thread (and its exit-time flush) unless already running."""
+        if self._launched:
+            return
+        with self._start_lock:
+            if self._launched or self._stopping.is_set():
+                return
+            self.start()
+            atexit.register(self.stop)
+            self._launched = True
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self.compress:
+            return gzip.open(self.path, "ab")
+        return open(self.path, "ab")
+
+    def _rotate(self):
+        self.file.close()
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.file = self._open()
+        self.written = 0
+
+    def _encode(self, record: logging.LogRecord) -> bytes:
+        if isinstance(record.msg, dict):
+            line = json.dumps(record.msg, default=to_json, ensure_ascii=False)
+        else:
+            line = json.dumps({"event": record.getMessage()}, ensure_ascii=False)
+        return (line + "\n").encode("utf-8")
+
+    def _encode_safely(self, record: logging.LogRecord) -> bytes:
+        # One bad record (e.g. a failing __str__) must not kill the thread
+        try:
+            return self._encode(record)
+        except Exception as e:
+            event = record.msg.get("event") if isinstance(record.msg, dict) else None
+            line = json.dumps({"event": "log_record_unencodable", "record_event": str(event), "error": repr(e)})
+            return (line + "\n").encode("utf-8")
+
+    def _close_quietly(self):
+        try:
+            if self.file is not None:
+                self.file.close()
+        except OSError:
+            pass
+        self.file = None
+
+    def _write(self, batch: list):
+        records = b"".join(batch)
+        data = records
+
+        # Notices are only marked reported once the batch carrying them lands
+        dropped = self.handler.dropped - self.reported_drops
+        if dropped:
+            data += b'{"event": "log_records_dropped", "count": %d}\n' % dropped
+        failed = self.failed_bytes
+        if failed:
+            data += b'{"event": "log_write_failed", "bytes": %d}\n' % failed
+
+        try:
+            if self.file is None:
+                self.file = self._open()
+            self.file.write(data)
+            self.file.flush()
+        except (OSError, ValueError):
+            # Disk full, permissions, ...: lose this batch, not the thread.
+            # The file is reopened for the next batch
+            self.failed_bytes += len(records)
+            self._close_quietly()
+            return
+
+        self.reported_drops += dropped
+        self.failed_bytes -= failed
+        self.written += len(data)
+        if self.max_bytes and self.written >= self.max_bytes:
+            try:
+                self._rotate()
+            except OSError:
+                # Keep appending to the current file; rotation is retried
+                # after the next batch
+                self._close_quietly()
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                record = self.queue.get(timeout=self.flush_interval)
+                while True:
+                    if record is self._STOP:
+                        stopping = True
+                        break
+                    batch.append(self._encode_safely(record))
+                    if len(batch) >= self.batch_size:
+                        break
+                    record = self.queue.get_nowait()
+            except queue.Empty:
+                pass
+
+            if batch or self.handler.dropped > self.reported_drops:
+                self._write(batch)
+
+            # stop() couldn't queue the sentinel; finish once the queue drains
+            if self._stopping.is_set() and self.queue.empty():
+                stopping = True
+
+        self._close_quietly()
+
+    def stop(self):
+        """Flush everything queued so far and close the file.
+
+        Never blocks for more than `stop_timeout` seconds, even if the queue
+        is full or the thread is stuck on a write.
+        """
+        with self._start_lock:
+            self._stopping.set()
+        if not self._launched:
+            return
+        deadline = time.monotonic() + self.stop_timeout
+        try:
+            self.queue.put(self._STOP, timeout=self.stop_timeout)
+        except queue.Full:
+            # The writer sees _stopping once it has drained the queue
+            pass
+        self.join(max(0.0, deadline - time.monotonic()))
@@ -0,0 +1,207 @@
+from mcp.types import Tool, CONNECTION_CLOSED
+from mcp.shared.exceptions import McpError
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from tracing import span
+import structlog
+import asyncio
+import httpx
+import anyio
+import time
+
+
+# Raised when the connection to a server breaks, as opposed to the tool failing
+TRANSPORT_ERRORS = (
+    anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream,
+    httpx.TransportError, ConnectionError,
+)
+
+
+def is_transport_error(error: Exception) -> bool:
+    """Whether `error` means the session is dead rather than the call was bad."""
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    return isinstance(error, TRANSPORT_ERRORS)
+
+
+class SessionPool:
+    """Long-lived MCP sessions, one warm connection per configured server.
+
+    Each server in the config gets its own client, so a stdio server is spawned
+    and handshaken once rather than on every `async with`. Tools are exposed
+    under the same names a multi-server fastmcp Client would use
+    (`<server>_<tool>` when more than one server is configured).
+
+    Args:
+        config (dict): MCP config in the Claude `mcpServers` structure.
+        health_check_interval (float, optional): Seconds a session may sit idle
+            before it is pinged on next use. Defaults to 30.
+    """
+    def __init__(self, config: dict, health_check_interval: float = 30.0):
+        servers = config.get("mcpServers", {})
+        if not servers:
+            raise RuntimeError("Config does not define any mcpServers.")
+
+        self.servers = servers
+        self.clients: dict[str, Client] = {name: self._new_client(name) for name in servers}
+        self.prefix_tools = len(servers) > 1
+        self.health_check_interval = health_check_interval
+
+        # Exposed tool name -> (server name, server-side tool name)
+        self.routes: dict[str, tuple[str, str]] = {}
+        self.tools: list[Tool] | None = None
+        # Exposed names of tools annotated as read-only
+        self.read_only: set[str] = set()
+
+        self._locks = {name: asyncio.Lock() for name in self.clients}
+        self._last_used = {name: 0.0 for name in self.clients}
+        self.stats = {"connects": 0, "connect_time": 0.0, "calls": 0, "call_time": 0.0}
+        self.log = structlog.get_logger()
+
+
+    async def _connect(self, name: str):
+        client = self.clients[name]
+        start = time.perf_counter()
+        with span("mcp.connect", server=name):
+            await client.__aenter__()
+        elapsed = time.perf_counter() - start
+
+        self.stats["connects"] += 1
+        self.stats["connect_time"] += elapsed
+        self._last_used[name] = time.monotonic()
+        self.log.info("mcp_connect", server=name, connect_time=elapsed)
+
+
+    def _new_client(self, name: str) -> Client:
+        return Client({"mcpServers": {name: self.servers[name]}})
+
+
+    async def _disconnect(self, name: str):
+        """Tear down `name`'s session and transport and replace its client.
+
+        A session that died on its own reports `is_connected()` False but keeps
+        its nesting count, and a kept-alive stdio transport keeps the dead
+        process's streams, so neither can be reused for the next connect.
+        """
+        client = self.clients[name]
+        try:
+            await client._disconnect(force=True)
+        except Exception as e:
+            self.log.warning("mcp_disconnect_failed", server=name, error=str(e))
+        try:
+            # An mcpServers transport doesn't close the server transport it wraps
+            await getattr(client.transport, "transport", client.transport).close()
+        except Exception as e:
+            self.log.warning("mcp_transport_close_failed", server=name, error=str(e))
+        self.clients[name] = self._new_client(name)
+
+
+    async def _ensure(self, name: str):
+        """Connect `name` if needed, pinging it first if it has been idle."""
+        async with self._locks[name]:
+            client = self.clients[name]
+
+            if client.is_connected():
+                idle = time.monotonic() - self._last_used[name]
+                if idle < self.health_check_interval:
+                    return
+                try:
+                    await client.ping()
+                    self._last_used[name] = time.monotonic()
+                    return
+                except Exception as e:
+                    self.log.warning("mcp_health_check_failed", server=name, error=str(e))
+                    await self._disconnect(name)
+
+            await self._connect(name)
+
+
+    async def _reconnect(self, name: str):
+        async with self._locks[name]:
+            await self._disconnect(name)
+            await self._connect(name)
+
+
+    async def connect(self):
+        """Warm every configured server."""
+        await asyncio.gather(*(self._ensure(name) for name in self.clients))
+
+
+    async def health_check(self) -> dict[str, bool]:
+        """Ping every server, reconnecting any that fail.
+
+        Returns:
+            dict[str, bool]: Whether each server was healthy before the check.
+        """
+        healthy = {}
+        for name, client in self.clients.items():
+            try:
+                if not client.is_connected():
+                    raise ConnectionError("not connected")
+                await client.ping()
+                healthy[name] = True
+            except Exception:
+                healthy[name] = False
+                await self._reconnect(name)
+        return healthy
+
+
+    async def list_tools(self, refresh: bool = False) -> list[Tool]:
+        """List tools across all servers, cached after the first call."""
+        if self.tools is not None and not refresh:
+            return self.tools
+
+        tools: list[Tool] = []
+        routes: dict[str, tuple[str, str]] = {}
+        read_only: set[str] = set()
+
+        for name, client in self.clients.items():
+            await self._ensure(name)
+            for tool in await client.list_tools():
+                exposed = f"{name}_{tool.name}" if self.prefix_tools else tool.name
+                routes[exposed] = (name, tool.name)
+                if tool.annotations and tool.annotations.readOnlyHint:
+                    read_only.add(exposed)
+                tools.append(tool.model_copy(update={"name": exposed}))
+
+        self.routes = routes
+        self.read_only = read_only
+        self.tools = tools
+        return tools
+
+
+    async def call_tool(self, name: str, args: dict | None = None):
+        """Call a tool on whichever server owns it, reconnecting once if the session died."""
+        if name not in self.routes:
+            await self.list_tools(refresh=True)
+        if name not in self.routes:
+            raise ToolError(f"Unknown tool: {name}")
+
+        server, tool_name = self.routes[name]
+        await self._ensure(server)
+
+        start = time.perf_counter()
+        connect_time = self.stats["connect_time"]
+        try:
+            try:
+                return await self.clients[server].call_tool(tool_name, args or {})
+            except Exception as e:
+                # Only a dead session is worth reconnecting; tool and
+                # argument errors would fail the same way again
+                if not is_transport_error(e):
+                    raise
+                self.log.warning("mcp_call_failed", server=server, tool=tool_name, error=repr(e))
+                await self._reconnect(server)
+                return await self.clients[server].call_tool(tool_name, args or {})
+        finally:
+            self.stats["calls"] += 1
+            # Any reconnect is reported as connect time, not call time
+            reconnect = self.stats["connect_time"] - connect_time
+            self.stats["call_time"] += time.perf_counter() - start - reconnect
+            self._last_used[server] = time.monotonic()
+
+
+    async def close(self):
+        for name in self.clients:
+            await self._disconnect(name)
+        self.tools = None
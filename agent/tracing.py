@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import structlog
+import time
+import uuid
+
+
+@dataclass
+class Span:
+    """One timed operation within a query."""
+    name: str
+    attrs: dict = field(default_factory=dict)
+    duration: float = 0.0
+
+
+@dataclass
+class QueryTrace:
+    """Spans recorded while processing one query."""
+    query_id: str
+    spans: list[Span] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        """Totals per span name, plus throttle wait, payload bytes and tokens."""
+        stages: dict[str, dict] = {}
+        for span in self.spans:
+            stage = stages.setdefault(span.name, {"count": 0, "wall_time": 0.0})
+            stage["count"] += 1
+            stage["wall_time"] += span.duration
+            for key in ("throttle_wait", "payload_bytes", "result_bytes", "prompt_tokens", "response_tokens"):
+                if span.attrs.get(key) is not None:
+                    stage[key] = stage.get(key, 0) + span.attrs[key]
+        return stages
+
+
+_trace: ContextVar[QueryTrace | None] = ContextVar("trace", default=None)
+_span: ContextVar[Span | None] = ContextVar("span", default=None)
+
+log = structlog.get_logger()
+
+
+@contextmanager
+def trace_query(query_id: str = None):
+    """Collect every span opened inside the block into one QueryTrace.
+
+    The summary is logged as a `query_trace` event when the block exits.
+    """
+    trace = QueryTrace(query_id=query_id or uuid.uuid4().hex[:12])
+    token = _trace.set(trace)
+    start = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+        log.info(
+            "query_trace",
+            query_id=trace.query_id,
+            wall_time=time.perf_counter() - start,
+            stages=trace.summary(),
+        )
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time the block as a span and log it as a `span` event.
+
+    Tasks created inside a traced query inherit its context, so spans from
+    concurrent tool calls land in the same trace.
+    """
+    current = Span(name=name, attrs=attrs)
+    token = _span.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - start
+        _span.reset(token)
+
+        trace = _trace.get()
+        if trace:
+            trace.spans.append(current)
+        log.info(
+            "span",
+            query_id=trace.query_id if trace else None,
+            name=name,
+            duration=current.duration,
+            **current.attrs,
+        )
+
+
+def annotate(**attrs):
+    """Add attributes to the innermost open span, if any."""
+    current = _span.get()
+    if current:
+        current.attrs.update(attrs)
@@ -0,0 +1,102 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import threading
+import json
+import time
+
+# -------------------------------------------------------------------------
+# Local stand-in for the GitHub REST API (repos, paginated endpoints, raw README)
+# -------------------------------------------------------------------------
+
+
+class GitHubFixture:
+    """Serves deterministic repos on localhost for utils/github_scraper.py.
+
+    Every repo has `counts[endpoint]` items, paginated with Link headers like
+    the real API. Requests and bytes sent are counted for the report.
+
+    Args:
+        counts (dict, optional): Items per endpoint.
+        latency (float, optional): Seconds added to every paginated response.
+    """
+    def __init__(self, counts: dict = None, latency: float = 0.0):
+        self.counts = counts or {"commits": 1000, "issues": 400, "pulls": 200, "forks": 100}
+        self.latency = latency
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> "GitHubFixture":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _item(self, endpoint: str, owner: str, i: int) -> dict:
+        stamp = f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T12:00:00Z"
+        if endpoint == "commits":
+            return {"sha": f"{i:040x}", "commit": {"message": f"Commit {i}",
+                    "author": {"name": f"dev{i % 17}", "date": stamp}, "committer": {"date": stamp}}}
+        if endpoint == "forks":
+            return {"id": i, "full_name": f"fork{i}/{owner}", "html_url": "", "created_at": stamp}
+        return {"id": i, "number": i, "title": f"Item {i}", "user": {"login": f"dev{i % 23}"},
+                "state": "closed" if i % 3 else "open", "created_at": stamp, "updated_at": stamp,
+                "closed_at": stamp if i % 3 else None, "merged_at": stamp if i % 2 else None,
+                "labels": [{"name": "bug"}] if i % 5 == 0 else [], "comments": i % 4, "body": "x" * 200}
+
+    def _handler(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, headers: dict = None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with fixture._lock:
+                    fixture.requests += 1
+                    fixture.bytes_sent += len(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = url.path.strip("/").split("/")
+
+                if parts[0] == "raw":
+                    return self._send(200, b"# Fixture repository\n\nBenchmark README.\n")
+                if len(parts) == 3 and parts[0] == "repos":
+                    owner, repo = parts[1], parts[2]
+                    body = {"full_name": f"{owner}/{repo}", "default_branch": "main", "owner": {"login": owner},
+                            "stargazers_count": 10, "forks_count": 2, "created_at": "2023-01-01T00:00:00Z"}
+                    return self._send(200, json.dumps(body).encode())
+                if len(parts) == 4 and parts[3] in fixture.counts:
+                    endpoint, total = parts[3], fixture.counts[parts[3]]
+                    page = int(query.get("page", ["1"])[0])
+                    per_page = int(query.get("per_page", ["30"])[0])
+                    last = max(1, -(-total // per_page))
+                    items = [fixture._item(endpoint, parts[1], i)
+                             for i in range((page - 1) * per_page, min(total, page * per_page))]
+                    if fixture.latency:
+                        time.sleep(fixture.latency)
+                    base = f"{fixture.url}{url.path}"
+                    headers = {"X-RateLimit-Remaining": "5000", "X-RateLimit-Reset": str(int(time.time()) + 3600)}
+                    if last > 1:
+                        headers["Link"] = (f'<{base}?page={min(page + 1, last)}&per_page={per_page}>; rel="next", '
+                                           f'<{base}?page={last}&per_page={per_page}>; rel="last"')
+                    return self._send(200, json.dumps(items).encode(), headers)
+                self._send(404, b"{}")
+
+        return Handler
@@ -0,0 +1,163 @@
+from pymongo.errors import OperationFailure
+import mongomock
+import random
+
+# -------------------------------------------------------------------------
+# mongomock behind the subset of pymongo's async API the server uses
+# -------------------------------------------------------------------------
+#
+# Operators mongomock lacks raise OperationFailure, as an unsupported query
+# would on a real server. That includes the geospatial ones ($geoNear,
+# $geoWithin), so the theatre geo tools return an error in the benchmark
+# rather than results; the default script doesn't call them.
+
+GENRES = ["Action", "Comedy", "Drama", "Documentary", "Horror", "Romance", "Sci-Fi", "Thriller", "Western"]
+STATES = ["CA", "NY", "TX", "FL", "WA", "IL", "OR", "MA", "AZ", "CO"]
+RATINGS = ["G", "PG", "PG-13", "R", "UNRATED"]
+
+
+def unsupported(error: NotImplementedError) -> OperationFailure:
+    return OperationFailure(f"Not supported by the benchmark stand-in: {error}")
+
+
+class AsyncCursor:
+    """Async iteration over a mongomock cursor or result list."""
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._iter = None
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, n):
+        self._cursor = self._cursor.limit(n)
+        return self
+
+    def skip(self, n):
+        self._cursor = self._cursor.skip(n)
+        return self
+
+    def max_time_ms(self, ms):
+        self._cursor = self._cursor.max_time_ms(ms)
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self._cursor)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+        except NotImplementedError as e:
+            raise unsupported(e)
+
+    async def to_list(self, length=None):
+        try:
+            docs = list(self._cursor)
+        except NotImplementedError as e:
+            raise unsupported(e)
+        return docs if length is None else docs[:length]
+
+    async def close(self):
+        pass
+
+
+class AsyncCollection:
+    def __init__(self, collection: mongomock.Collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self._collection.find(*args, **kwargs))
+
+    async def aggregate(self, pipeline, **kwargs):
+        # maxTimeMS / allowDiskUse have no meaning in memory
+        try:
+            return AsyncCursor(self._collection.aggregate(pipeline))
+        except NotImplementedError as e:
+            raise unsupported(e)
+
+    async def distinct(self, field, filter=None):
+        return self._collection.distinct(field, filter)
+
+    async def count_documents(self, filter, **kwargs):
+        try:
+            return self._collection.count_documents(filter)
+        except NotImplementedError as e:
+            raise unsupported(e)
+
+    async def create_index(self, keys, **kwargs):
+        return self._collection.create_index(keys, **kwargs)
+
+    async def index_information(self):
+        return self._collection.index_information()
+
+
+class AsyncDatabase:
+    def __init__(self, database: mongomock.Database):
+        self._database = database
+
+    def __getitem__(self, name):
+        return AsyncCollection(self._database[name])
+
+    async def list_collection_names(self):
+        return self._database.list_collection_names()
+
+    async def command(self, command, **kwargs):
+        name = command if isinstance(command, str) else next(iter(command))
+        if name == "ping":
+            return {"ok": 1.0}
+        if name == "explain":
+            return {"ok": 1.0, "stages": [], "executionStats": {"nReturned": 0, "executionTimeMillis": 0}}
+        raise OperationFailure(f"Command {name} is not supported by the benchmark stand-in")
+
+
+class AsyncMockClient:
+    """Stands in for `AsyncMongoClient`; assign it to `mongo_client.client`."""
+    def __init__(self):
+        self._client = mongomock.MongoClient()
+
+    def __getitem__(self, name):
+        return AsyncDatabase(self._client[name])
+
+    async def close(self):
+        pass
+
+
+def seed_mflix(client: AsyncMockClient, movies: int = 2000, theaters: int = 500, seed: int = 0):
+    """Fills `sample_mflix` with deterministic mflix-shaped documents."""
+    rng = random.Random(seed)
+    db = client._client["sample_mflix"]
+
+    db.movies.insert_many([
+        {
+            "title": f"Movie {i}",
+            "year": 1950 + rng.randrange(70),
+            "genres": rng.sample(GENRES, rng.randint(1, 3)),
+            "runtime": rng.randint(70, 180),
+            "rated": rng.choice(RATINGS),
+            "directors": [f"Director {rng.randrange(movies // 10 or 1)}"],
+            "cast": [f"Actor {rng.randrange(movies)}" for _ in range(6)],
+            "plot": " ".join(rng.choice(GENRES).lower() for _ in range(30)),
+            "fullplot": " ".join(rng.choice(GENRES).lower() for _ in range(200)),
+            "imdb": {"rating": round(rng.uniform(1, 10), 1), "votes": rng.randrange(100000)},
+        }
+        for i in range(movies)
+    ])
+    db.theaters.insert_many([
+        {
+            "theaterId": 1000 + i,
+            "location": {
+                "address": {
+                    "street1": f"{rng.randrange(9999)} Main St",
+                    "city": f"City {rng.randrange(200)}",
+                    "state": rng.choice(STATES),
+                    "zipcode": f"{rng.randrange(10000, 99999)}",
+                },
+                "geo": {"type": "Point", "coordinates": [rng.uniform(-124, -70), rng.uniform(25, 48)]},
+            },
+        }
+        for i in range(theaters)
+    ])
@@ -0,0 +1,26 @@
+import os
+import sys
+
+# -------------------------------------------------------------------------
+# Runs server/server.py against seeded in-memory Mongo (same CLI as server.py)
+# -------------------------------------------------------------------------
+
+server_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'server'))
+sys.path.insert(0, server_dir)
+
+from mock_mongo import AsyncMockClient, seed_mflix
+import mongodb.mongo_client as mongo_client
+
+# get_client() returns this instead of connecting to Atlas
+mongo_client.client = AsyncMockClient()
+seed_mflix(
+    mongo_client.client,
+    movies=int(os.getenv("BENCH_MOVIES", "2000")),
+    theaters=int(os.getenv("BENCH_THEATERS", "500")),
+    seed=int(os.getenv("BENCH_SEED", "0")),
+)
+
+import server
+
+if __name__ == "__main__":
+    server.main()
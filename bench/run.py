@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import tempfile
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+
+# -------------------------------------------------------------------------
+# Offline end-to-end benchmark: scripted LLM + agent loop + MCP server on
+# in-memory Mongo, and the scraper against a local GitHub fixture
+# -------------------------------------------------------------------------
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(bench_dir, '..'))
+work_dir = tempfile.mkdtemp(prefix='agent-bench-')
+log_dir = os.path.join(work_dir, 'logs')
+
+# Must be set before the agent and scraper modules are imported
+os.environ['AGENT_LOG_DIR'] = log_dir
+os.environ['SERVER_LOG_DIR'] = log_dir
+os.environ['SCRAPER_DATA_DIR'] = os.path.join(work_dir, 'data')
+os.makedirs(os.environ['SCRAPER_DATA_DIR'], exist_ok=True)
+
+for path in (os.path.join(root_dir, 'agent'), os.path.join(root_dir, 'utils'), bench_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from agent import Agent
+from session_pool import SessionPool
+from scripted_llm import ScriptedLLM
+from github_fixture import GitHubFixture
+from trace_report import build_report
+import logger.config
+import github_scraper
+
+# Tool calls per LLM turn; turn 2 exercises concurrent dispatch
+DEFAULT_SCRIPT = [
+    [("list_genres", {})],
+    [("get_movies_by_genre", {"genre": "Drama", "num": 20}),
+     ("get_theatres_by_state", {"state": "CA", "num": 20})],
+    [("aggregate", {"collection": "movies", "limit": 50,
+                    "pipeline": [{"$group": {"_id": "$rated", "n": {"$sum": 1}}}, {"$sort": {"_id": 1}}]})],
+]
+
+def server_config(args):
+    env = {
+        'SERVER_LOG_DIR': log_dir,
+        'SCRAPER_DATA_DIR': os.environ['SCRAPER_DATA_DIR'],
+        'BENCH_MOVIES': str(args.movies),
+        'BENCH_THEATERS': str(args.theaters),
+        'BENCH_SEED': str(args.seed),
+    }
+    return {"mcpServers": {"mflix": {
+        "command": sys.executable,
+        "args": [os.path.join(bench_dir, 'mock_server.py')],
+        "env": env,
+    }}}
+
+async def bench_agent(args):
+    config = server_config(args)
+    config_path = os.path.join(work_dir, 'config.json')
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+
+    sessions = SessionPool(config)
+    llm = ScriptedLLM(DEFAULT_SCRIPT, latency=args.llm_latency)
+    agents = [
+        Agent(config_path, None, sessions=sessions, llm=llm, concurrent_tools=True, token_budget=args.token_budget)
+        for _ in range(args.concurrency)
+    ]
+
+    start = time.perf_counter()
+    await sessions.connect()
+    await sessions.list_tools()
+    startup = time.perf_counter() - start
+
+    # Each worker drives its own Agent over a shared queue of queries
+    queue = asyncio.Queue()
+    for i in range(args.queries):
+        queue.put_nowait(f"q{i}")
+
+    async def worker(agent):
+        while not queue.empty():
+            query_id = queue.get_nowait()
+            await agent.process_query(f"Benchmark query {query_id}", query_id=query_id)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker(agent) for agent in agents))
+    finally:
+        wall_time = time.perf_counter() - start
+        await sessions.close()
+
+    return {
+        'queries': args.queries,
+        'concurrency': args.concurrency,
+        'startup_time': startup,
+        'wall_time': wall_time,
+        'qps': args.queries / wall_time if wall_time else None,
+        'session_stats': dict(sessions.stats),
+    }
+
+def bench_scraper(args):
+    fixture = GitHubFixture(latency=args.github_latency).start()
+    github_scraper.api_root = fixture.url
+    github_scraper.raw_root = f"{fixture.url}/raw"
+
+    session = github_scraper.make_session()
+    limiter = github_scraper.RateLimiter()
+    items = 0
+
+    def scrape(index):
+        owner, repo = f"bench{index}", f"repo{index}"
+        repo_dir = github_scraper.ensure_repo_dir(repo)
+        github_scraper.fetch_repo_metadata(session, owner, repo, limiter)
+        return sum(
+            github_scraper.fetch_paginated(session, owner, repo, endpoint, mapper, limiter,
+                                           os.path.join(repo_dir, filename))
+            for filename, (endpoint, mapper) in github_scraper.endpoint_files.items()
+        )
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.scrape_workers) as pool:
+            items = sum(pool.map(scrape, range(args.repos)))
+    finally:
+        wall_time = time.perf_counter() - start
+        fixture.stop()
+
+    return {
+        'repos': args.repos,
+        'wall_time': wall_time,
+        'items': items,
+        'requests': fixture.requests,
+        'bytes': fixture.bytes_sent,
+        'items_per_sec': items / wall_time if wall_time else None,
+        'requests_per_sec': fixture.requests / wall_time if wall_time else None,
+    }
+
+def peak_rss_kb():
+    # ru_maxrss is in kilobytes on Linux; children covers the stdio server once reaped
+    return {
+        'harness': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+# Main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Offline benchmark of the agent loop, MCP server and scraper.")
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="Simulated seconds per LLM call")
+    parser.add_argument('--token-budget', type=int, default=None)
+    parser.add_argument('--movies', type=int, default=2000)
+    parser.add_argument('--theaters', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repos', type=int, default=4, help="Fixture repositories to scrape (0 to skip)")
+    parser.add_argument('--scrape-workers', type=int, default=2)
+    parser.add_argument('--github-latency', type=float, default=0.0, help="Simulated seconds per GitHub page")
+    parser.add_argument('--output', help="Write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    report = {'config': vars(args)}
+    if args.queries:
+        report['agent'] = asyncio.run(bench_agent(args))
+    if args.repos:
+        # The scraper reports progress on stdout; keep stdout for the JSON report
+        with redirect_stdout(sys.stderr):
+            report['scraper'] = bench_scraper(args)
+
+    # Flush the agent log, then fold span latencies from both agent and server logs
+    logger.config.writer.stop()
+    traces = build_report(log_dir)
+    if 'agent' in report:
+        report['agent']['latency'] = traces['queries']
+        report['agent']['stages'] = traces['stages']
+        report['agent']['bytes'] = {
+            'llm_payload': sum(stage.get('payload_bytes', 0) for stage in traces['stages'].values()),
+            'tool_results': traces['stages'].get('mcp.call_tool', {}).get('result_bytes', 0),
+        }
+    report['peak_rss_kb'] = peak_rss_kb()
+    report['work_dir'] = work_dir
+
+    encoded = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(encoded)
+    print(encoded)
@@ -0,0 +1,41 @@
+from llm_integrations.base import APIPlatform
+from llm_integrations.prompt import PromptAssembler
+from google.genai import types
+from mcp.types import Tool
+from tracing import annotate
+import asyncio
+
+
+class ScriptedLLM(APIPlatform):
+    """Deterministic stand-in for an LLM, replaying a fixed tool-call script.
+
+    Turn `n` of a query (counted by the model messages already in the
+    history) issues the function calls in `script[n]`; once the script is
+    exhausted a final text answer is returned. Payload size is measured the
+    same way as for Gemini so byte counts are comparable between runs.
+
+    Args:
+        script (list[list[tuple[str, dict]]]): Function calls per turn.
+        latency (float, optional): Simulated seconds per call. Defaults to 0.
+        system_prompt (str, optional): Counted in the payload size.
+    """
+    def __init__(self, script: list[list[tuple[str, dict]]], latency: float = 0.0, system_prompt: str = None):
+        super().__init__()
+        self.script = script
+        self.latency = latency
+        self.prompt = PromptAssembler(system_prompt)
+
+    async def chat(self, messages: list[types.Content], tools: list[Tool]) -> types.Content:
+        _, _, size = self.prompt.build(messages, tools)
+        annotate(payload_bytes=size.system_bytes + size.history_bytes, prompt_tokens=size.estimated_tokens)
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        turn = sum(1 for message in messages if message.role == "model")
+        if turn < len(self.script):
+            parts = [types.Part.from_function_call(name=name, args=args) for name, args in self.script[turn]]
+        else:
+            results = sum(1 for message in messages for part in message.parts or [] if part.function_response)
+            parts = [types.Part(text=f"Answered from {results} tool results.")]
+        return types.Content(role="model", parts=parts)
@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+
+# -------------------------------------------------------------------------
+# Startup timing: import cost of the entry points (via -X importtime) and
+# how long a stdio MCP server takes to answer initialize and tools/list
+# -------------------------------------------------------------------------
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(bench_dir, '..'))
+
+# Entry point -> (directory it is imported from, module)
+entry_points = {
+    'server': (os.path.join(root_dir, 'server'), 'server'),
+    'agent': (os.path.join(root_dir, 'agent'), 'agent'),
+}
+
+# "import time: self | cumulative | <indent>module" -> (self, cumulative, depth, module)
+def parse_importtime(stderr):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+def time_import(directory, module, env):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=directory, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return wall, parse_importtime(result.stderr)
+
+def import_report(name, runs, top, env):
+    directory, module = entry_points[name]
+    walls, totals, last = [], [], []
+    for _ in range(runs):
+        wall, rows = time_import(directory, module, env)
+        walls.append(wall)
+        totals.append(next(cum for _, cum, depth, mod in rows if depth == 0 and mod == module))
+        last = rows
+
+    # Heaviest imports one or two levels below the entry point
+    heaviest = sorted((row for row in last if 1 <= row[2] <= 2), key=lambda row: -row[1])[:top]
+    return {
+        'process_wall_s': statistics.median(walls),
+        'import_s': statistics.median(totals) / 1e6,
+        'top_modules': [{'module': mod, 'cumulative_ms': cum / 1000} for _, cum, _, mod in heaviest],
+    }
+
+async def handshake(config):
+    from fastmcp import Client
+
+    client = Client(config)
+    start = time.perf_counter()
+    async with client:
+        initialized = time.perf_counter() - start
+        await client.list_tools()
+        listed = time.perf_counter() - start
+    return initialized, listed
+
+def server_report(runs, mock, env):
+    script = os.path.join(bench_dir, 'mock_server.py') if mock else os.path.join(root_dir, 'server', 'server.py')
+    config = {"mcpServers": {"mflix": {"command": sys.executable, "args": [script], "env": env}}}
+    samples = [asyncio.run(handshake(config)) for _ in range(runs)]
+    return {
+        'server': os.path.relpath(script, root_dir),
+        'initialize_s': statistics.median(s[0] for s in samples),
+        'tools_listed_s': statistics.median(s[1] for s in samples),
+    }
+
+# Main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Report startup time of the agent and MCP server entry points.")
+    parser.add_argument('--runs', type=int, default=3, help="Samples per measurement (the median is reported)")
+    parser.add_argument('--top', type=int, default=10, help="Heaviest imports listed per entry point")
+    parser.add_argument('--mock', action='store_true', help="Handshake with bench/mock_server.py instead of server.py")
+    parser.add_argument('--skip-handshake', action='store_true')
+    parser.add_argument('--output', help="Write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    # Keep log files from the measured processes out of the repo
+    env = dict(os.environ)
+    env.setdefault('SERVER_LOG_DIR', os.path.join(root_dir, 'logs'))
+    env.setdefault('AGENT_LOG_DIR', os.path.join(root_dir, 'logs'))
+
+    report = {'imports': {name: import_report(name, args.runs, args.top, env) for name in entry_points}}
+    if not args.skip_handshake:
+        report['stdio_server'] = server_report(args.runs, args.mock, {
+            'SERVER_LOG_DIR': env['SERVER_LOG_DIR'],
+            **({'BENCH_MOVIES': '200', 'BENCH_THEATERS': '50'} if args.mock else {}),
+        })
+
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(encoded)
+    print(encoded)
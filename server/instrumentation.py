@@ -0,0 +1,52 @@
+from datetime import datetime
+from functools import wraps
+import logging
+import json
+import time
+import os
+
+class LazyFileHandler(logging.FileHandler):
+    """FileHandler that creates its file, and the directory, on the first record."""
+    def __init__(self, filename: str):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+# Server spans go to their own JSON-lines file; stdout is the stdio transport
+log_dir = os.getenv("SERVER_LOG_DIR", os.path.join(os.path.dirname(__file__), '..', 'logs'))
+timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+log = logging.getLogger("mcp_server.spans")
+log.setLevel(logging.INFO)
+log.propagate = False
+handler = LazyFileHandler(os.path.join(log_dir, f"mcp_server_{timestamp}.log"))
+handler.setFormatter(logging.Formatter("%(message)s"))
+log.addHandler(handler)
+
+
+def traced(func):
+    """Logs a `span` event with wall time and result size for each tool call.
+
+    Must sit below `@mcp.tool()` so FastMCP still sees the tool's signature.
+    """
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        event = {"event": "span", "name": f"server.{func.__name__}"}
+        try:
+            result = await func(*args, **kwargs)
+            event["result_bytes"] = len(json.dumps(result, default=str))
+            if isinstance(result, dict) and "error" in result:
+                event["error"] = result["error"]
+            return result
+        except Exception as e:
+            event["error"] = type(e).__name__
+            raise
+        finally:
+            event["duration"] = time.perf_counter() - start
+            log.info(json.dumps(event))
+
+    return wrapper
@@ -0,0 +1,51 @@
+from contextlib import asynccontextmanager
+from mcp.server.fastmcp import FastMCP
+from mcp.server.lowlevel.server import request_ctx
+from weakref import WeakKeyDictionary
+from typing import Any
+import asyncio
+import os
+
+MAX_CLIENT_CONCURRENCY = int(os.environ.get("MCP_MAX_CLIENT_CONCURRENCY", "8"))
+
+
+class ClientLimiter:
+    """Caps how many tool calls each connected client runs at once.
+
+    Calls beyond the limit wait for a slot rather than failing, so one busy
+    agent cannot starve the others sharing an HTTP server. Clients are told
+    apart by their MCP session, which lasts as long as the connection.
+
+    Args:
+        max_concurrency (int): Concurrent calls per client. 0 disables the limit.
+    """
+    def __init__(self, max_concurrency: int = MAX_CLIENT_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._semaphores: WeakKeyDictionary = WeakKeyDictionary()
+
+    @asynccontextmanager
+    async def slot(self):
+        try:
+            session = request_ctx.get().session
+        except LookupError:
+            session = None
+        if not self.max_concurrency or session is None:
+            yield
+            return
+
+        semaphore = self._semaphores.get(session)
+        if semaphore is None:
+            semaphore = self._semaphores[session] = asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            yield
+
+
+class LimitedFastMCP(FastMCP):
+    """FastMCP whose tool calls go through a per-client `ClientLimiter`."""
+    def __init__(self, *args, limiter: ClientLimiter | None = None, **kwargs):
+        self.limiter = limiter or ClientLimiter()
+        super().__init__(*args, **kwargs)
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]):
+        async with self.limiter.slot():
+            return await super().call_tool(name, arguments)
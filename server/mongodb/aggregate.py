@@ -0,0 +1,111 @@
+from .paging import MAX_RESPONSE_BYTES, fit_document
+from typing import Any
+import json
+import os
+
+# Read-only stages the agent may use; anything else is rejected
+ALLOWED_STAGES = {
+    "$match", "$group", "$sort", "$limit", "$skip", "$project", "$addFields", "$set",
+    "$unset", "$unwind", "$count", "$bucket", "$bucketAuto", "$sortByCount", "$sample",
+}
+# Operators that run server-side JavaScript or touch other collections
+FORBIDDEN_OPERATORS = {"$where", "$function", "$accumulator", "$lookup", "$out", "$merge", "$unionWith"}
+
+MAX_STAGES = 20
+MAX_TIME_MS = int(os.environ.get("MCP_AGGREGATE_MAX_TIME_MS", "5000"))
+MAX_RESULTS = int(os.environ.get("MCP_AGGREGATE_MAX_RESULTS", "1000"))
+ALLOW_DISK_USE = os.environ.get("MCP_AGGREGATE_ALLOW_DISK_USE", "1") == "1"
+
+def _check_operators(value: Any):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in FORBIDDEN_OPERATORS:
+                raise ValueError(f"Operator {key} is not allowed")
+            _check_operators(item)
+    elif isinstance(value, list):
+        for item in value:
+            _check_operators(item)
+
+def validate_pipeline(pipeline: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Checks a pipeline against the stage whitelist.
+
+    Raises:
+        ValueError: If the pipeline is malformed or uses a disallowed stage or operator.
+    """
+    if not isinstance(pipeline, list) or not pipeline:
+        raise ValueError("Pipeline must be a non-empty list of stages")
+    if len(pipeline) > MAX_STAGES:
+        raise ValueError(f"Pipeline has more than {MAX_STAGES} stages")
+
+    for stage in pipeline:
+        if not isinstance(stage, dict) or len(stage) != 1:
+            raise ValueError(f"Each stage must be a single-key object, got {stage!r}")
+        name = next(iter(stage))
+        if name not in ALLOWED_STAGES:
+            raise ValueError(f"Stage {name} is not allowed; use one of {sorted(ALLOWED_STAGES)}")
+        _check_operators(stage[name])
+
+    return pipeline
+
+def summarise_explain(explain: dict[str, Any]) -> dict[str, Any]:
+    """Pulls execution stats and plan stage names out of an explain document."""
+    summary: dict[str, Any] = {"plan_stages": []}
+
+    def walk(node: Any):
+        if isinstance(node, dict):
+            stats = node.get("executionStats")
+            if isinstance(stats, dict) and "nReturned" not in summary:
+                for key in ("nReturned", "executionTimeMillis", "totalKeysExamined", "totalDocsExamined"):
+                    summary[key] = stats.get(key)
+            if isinstance(node.get("stage"), str):
+                summary["plan_stages"].append(node["stage"])
+            for key, item in node.items():
+                if key != "allPlansExecution":
+                    walk(item)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(explain)
+    return summary
+
+async def run_aggregate(db, collection: str, pipeline: list[dict[str, Any]], limit: int,
+                        explain: bool = False, max_bytes: int = MAX_RESPONSE_BYTES) -> dict[str, Any]:
+    """Runs a validated pipeline with time, disk and result-size limits.
+
+    Returns:
+        dict[str, Any]: `results`, `truncated`, and `explain` stats if requested.
+    """
+    limit = max(1, min(limit, MAX_RESULTS))
+    pipeline = validate_pipeline(pipeline) + [{"$limit": limit + 1}]
+
+    cursor = await db[collection].aggregate(pipeline, maxTimeMS=MAX_TIME_MS, allowDiskUse=ALLOW_DISK_USE)
+
+    results, size, truncated = [], 2, False
+    async for doc in cursor:
+        if len(results) == limit:
+            truncated = True
+            break
+        encoded = json.dumps(doc, default=str)
+        if size + len(encoded) + 1 > max_bytes:
+            if results:
+                truncated = True
+                break
+            # A single result larger than the budget is shrunk, not returned whole
+            doc = json.loads(encoded)
+            truncated = fit_document(doc, max_bytes - size)
+            encoded = json.dumps(doc)
+        results.append(json.loads(encoded))
+        size += len(encoded) + 1
+    await cursor.close()
+
+    response: dict[str, Any] = {"results": results, "truncated": truncated}
+
+    if explain:
+        plan = await db.command({
+            "explain": {"aggregate": collection, "pipeline": pipeline, "cursor": {}},
+            "verbosity": "executionStats",
+        }, maxTimeMS=MAX_TIME_MS)
+        response["explain"] = summarise_explain(plan)
+
+    return response
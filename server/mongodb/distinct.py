@@ -0,0 +1,85 @@
+from typing import Any
+import asyncio
+import time
+import os
+
+# Distinct lookups the agent makes often; these fields get a supporting index
+INDEXED_FIELDS = [
+    ("movies", "genres"),
+    ("theaters", "location.address.state"),
+]
+
+DISTINCT_TTL = float(os.environ.get("MCP_DISTINCT_TTL", "600"))
+
+class DistinctService:
+    """Cached distinct values for `(collection, field)` pairs.
+
+    Values are computed inside MongoDB (`distinct`, or a `$group` pipeline when
+    the result is too large for `distinct`) and kept in memory for `ttl`
+    seconds. The server never writes to the database, so expiry is the only
+    way an entry is refreshed; lower `MCP_DISTINCT_TTL` if the data changes
+    often. Concurrent misses for the same pair share one query.
+
+    Args:
+        db: Async database handle.
+        ttl (float, optional): Seconds a cached result stays valid.
+    """
+    def __init__(self, db, ttl: float = DISTINCT_TTL):
+        self.db = db
+        self.ttl = ttl
+        self._cache: dict[tuple[str, str], tuple[float, list]] = {}
+        self._pending: dict[tuple[str, str], asyncio.Future] = {}
+
+    async def ensure_indexes(self):
+        """Creates the indexes behind `INDEXED_FIELDS` if they are missing."""
+        for collection, field in INDEXED_FIELDS:
+            await self.db[collection].create_index(field)
+
+    async def _query(self, collection: str, field: str) -> list:
+        from pymongo.errors import OperationFailure
+        try:
+            values = await self.db[collection].distinct(field)
+        except OperationFailure:
+            # distinct results are limited to 16 MB; $group streams instead
+            pipeline = [
+                {"$project": {"value": f"${field}"}},
+                {"$unwind": "$value"},
+                {"$group": {"_id": "$value"}},
+            ]
+            cursor = await self.db[collection].aggregate(pipeline, allowDiskUse=True)
+            values = [doc["_id"] async for doc in cursor]
+
+        # drop nulls and sort if possible
+        cleaned = [v for v in values if v is not None]
+        try:
+            return sorted(cleaned)
+        except TypeError:
+            return cleaned
+
+    async def values(self, collection: str, field: str) -> list[Any]:
+        """Returns the sorted distinct values of `field` in `collection`."""
+        key = (collection, field)
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        if key in self._pending:
+            return await asyncio.shield(self._pending[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            values = await self._query(collection, field)
+            self._cache[key] = (time.monotonic() + self.ttl, values)
+            future.set_result(values)
+            return values
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; avoid "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
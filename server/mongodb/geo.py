@@ -0,0 +1,106 @@
+from .aggregate import MAX_TIME_MS
+from .paging import MAX_PAGE_SIZE
+from typing import Any
+import asyncio
+
+# Equatorial Earth radius, the figure MongoDB uses in its own radian
+# conversions; $centerSphere takes its radius in radians
+EARTH_RADIUS_KM = 6378.1
+
+def check_point(longitude: float, latitude: float):
+    """Raises ValueError unless the coordinates are a valid GeoJSON point."""
+    if not -180 <= longitude <= 180:
+        raise ValueError("longitude must be between -180 and 180")
+    if not -90 <= latitude <= 90:
+        raise ValueError("latitude must be between -90 and 90")
+
+def _projection(projection: dict[str, int] | None) -> dict[str, Any]:
+    # The ObjectId means nothing to the agent; leave it out unless asked for
+    projection = dict(projection or {})
+    projection.setdefault("_id", 0)
+    return projection
+
+class GeoService:
+    """Nearest-point and within-radius queries on a GeoJSON `Point` field.
+
+    The 2dsphere index both queries rely on is created on first use (and by
+    `ensure_index` at start-up), so the tools work on a fresh database.
+
+    Args:
+        db: Async database handle.
+        collection (str): Collection holding the points.
+        field (str): Path of the GeoJSON point in each document.
+    """
+    def __init__(self, db, collection: str, field: str):
+        self.db = db
+        self.collection = collection
+        self.field = field
+        self._indexed: asyncio.Future | None = None
+
+    async def ensure_index(self):
+        """Creates the 2dsphere index on `field` once; concurrent callers share the call."""
+        failed = self._indexed is not None and self._indexed.done() and (
+            self._indexed.cancelled() or self._indexed.exception() is not None)
+        if self._indexed is None or failed:
+            self._indexed = asyncio.ensure_future(
+                self.db[self.collection].create_index([(self.field, "2dsphere")]))
+        await asyncio.shield(self._indexed)
+
+    async def near(self, longitude: float, latitude: float, num: int,
+                   max_distance_km: float | None = None,
+                   projection: dict[str, int] | None = None) -> dict[str, Any]:
+        """The `num` documents closest to a point, nearest first.
+
+        Returns:
+            dict[str, Any]: `results`, each with `distance_km`.
+        """
+        check_point(longitude, latitude)
+        await self.ensure_index()
+
+        geo_near: dict[str, Any] = {
+            "near": {"type": "Point", "coordinates": [longitude, latitude]},
+            "key": self.field,
+            "distanceField": "distance_km",
+            "distanceMultiplier": 0.001,
+            "spherical": True,
+        }
+        if max_distance_km is not None:
+            # maxDistance is in metres for GeoJSON points
+            geo_near["maxDistance"] = max_distance_km * 1000
+
+        project = _projection(projection)
+        project["distance_km"] = {"$round": ["$distance_km", 2]}
+        pipeline = [
+            {"$geoNear": geo_near},
+            {"$limit": max(1, min(num, MAX_PAGE_SIZE))},
+            {"$project": project},
+        ]
+        cursor = await self.db[self.collection].aggregate(pipeline, maxTimeMS=MAX_TIME_MS)
+        return {"results": [doc async for doc in cursor]}
+
+    async def within(self, longitude: float, latitude: float, radius_km: float, num: int,
+                     projection: dict[str, int] | None = None) -> dict[str, Any]:
+        """Documents within `radius_km` of a point, up to `num` of them.
+
+        Returns:
+            dict[str, Any]: `count` of all matches, and `results` (in no
+                particular order; use `near` for the closest).
+        """
+        check_point(longitude, latitude)
+        if radius_km <= 0:
+            raise ValueError("radius_km must be positive")
+        await self.ensure_index()
+
+        query = {self.field: {"$geoWithin": {
+            "$centerSphere": [[longitude, latitude], radius_km / EARTH_RADIUS_KM],
+        }}}
+        collection = self.db[self.collection]
+        limit = max(1, min(num, MAX_PAGE_SIZE))
+
+        async def page():
+            found = collection.find(query, _projection(projection)).limit(limit).max_time_ms(MAX_TIME_MS)
+            return [doc async for doc in found]
+
+        # The page and the total are independent indexed queries
+        results, count = await asyncio.gather(page(), collection.count_documents(query, maxTimeMS=MAX_TIME_MS))
+        return {"count": count, "results": results}
@@ -1,22 +1,78 @@
-from dotenv import load_dotenv, find_dotenv
-from pymongo import MongoClient
-import certifi
+from typing import Any
+import asyncio
 import os
 
-load_dotenv(find_dotenv())
+# Connection settings are read on first use, after .env has been loaded
+client = None
+_env_loaded = False
 
-# Check if environment variables are set
-USER_NAME = os.environ.get("MONGODB_USER")
-PASSWORD = os.environ.get("MONGODB_PWD")
-CLUSTER = os.environ.get("MONGODB_CLUSTER")
+def load_env():
+    """Loads `.env` once, on first use rather than at import time."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv, find_dotenv
+        load_dotenv(find_dotenv())
+        _env_loaded = True
 
-connection_string = f"mongodb+srv://{USER_NAME}:{PASSWORD}@{CLUSTER}.ef1ihgu.mongodb.net/?retryWrites=true&w=majority&appName={CLUSTER}"
-client = MongoClient(connection_string, tlsCAFile=certifi.where())
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, str(default)))
+
+def get_client():
+    """Returns the shared async client, creating it on first use.
+
+    pymongo is imported here rather than at module level so that starting
+    the server does not pay for it until a tool needs the database.
+    """
+    global client
+    if client is None:
+        load_env()
+        from pymongo import AsyncMongoClient
+        import certifi
+
+        user_name = os.environ.get("MONGODB_USER")
+        password = os.environ.get("MONGODB_PWD")
+        cluster = os.environ.get("MONGODB_CLUSTER")
+        connection_string = f"mongodb+srv://{user_name}:{password}@{cluster}.ef1ihgu.mongodb.net/?retryWrites=true&w=majority&appName={cluster}"
+
+        client = AsyncMongoClient(
+            connection_string,
+            tlsCAFile=certifi.where(),
+            maxPoolSize=_env_int("MONGODB_MAX_POOL_SIZE", 50),
+            minPoolSize=_env_int("MONGODB_MIN_POOL_SIZE", 4),
+            serverSelectionTimeoutMS=_env_int("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 5000),
+            connectTimeoutMS=_env_int("MONGODB_CONNECT_TIMEOUT_MS", 5000),
+            socketTimeoutMS=_env_int("MONGODB_SOCKET_TIMEOUT_MS", 30000),
+            readPreference=os.environ.get("MONGODB_READ_PREFERENCE", "primaryPreferred"),
+        )
+    return client
 
 def get_db():
     try:
-        db = client['sample_mflix']
+        db = get_client()['sample_mflix']
         return db
     except Exception as e:
         raise Exception(
             "The following error occurred: ", e)
+
+class LazyDatabase:
+    """Stands in for the `sample_mflix` database until it is first used.
+
+    Attribute and item access are forwarded to `get_db()`, so modules can
+    hold a database handle at import time without creating the client.
+    """
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_db(), name)
+
+    def __getitem__(self, name: str) -> Any:
+        return get_db()[name]
+
+async def warm_up():
+    """Resolves the cluster and opens `MONGODB_MIN_POOL_SIZE` connections up front."""
+    db = get_db()
+    await asyncio.gather(*(db.command("ping") for _ in range(max(1, _env_int("MONGODB_MIN_POOL_SIZE", 4)))))
+
+async def close_client():
+    global client
+    if client is not None:
+        await client.close()
+        client = None
@@ -0,0 +1,128 @@
+from typing import Any
+import base64
+import json
+import os
+
+# Hard cap on the serialized size of one tool response
+MAX_RESPONSE_BYTES = int(os.environ.get("MCP_MAX_RESPONSE_BYTES", "32000"))
+MAX_PAGE_SIZE = int(os.environ.get("MCP_MAX_PAGE_SIZE", "100"))
+
+def encode_cursor(last_id: Any) -> str:
+    """Encodes the last `_id` of a page as an opaque resume token."""
+    from bson import ObjectId
+    if isinstance(last_id, ObjectId):
+        payload = {"oid": str(last_id)}
+    else:
+        payload = {"id": last_id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Any:
+    """Decodes a token from `encode_cursor` back into an `_id` value.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    from bson import ObjectId
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return ObjectId(payload["oid"]) if "oid" in payload else payload["id"]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def build_projection(fields: list[str] | None, default: dict[str, int] | None) -> dict[str, int] | None:
+    """Projection for the requested fields, falling back to a compact default."""
+    if fields:
+        return {field: 1 for field in fields}
+    return default
+
+def _encoded_size(value: Any) -> int:
+    return len(json.dumps(value, default=str))
+
+def fit_document(doc: dict[str, Any], max_bytes: int) -> bool:
+    """Shrinks `doc` in place until it serializes to at most `max_bytes`.
+
+    The largest field is shrunk first, by at most half per step: strings are
+    cut short (ending in "..."), lists lose their tail half, and anything
+    else is removed. The names of
+    the shortened fields are listed under `_truncated`; `_id` is kept.
+
+    Returns:
+        bool: Whether the document had to be shrunk.
+    """
+    if _encoded_size(doc) + 1 <= max_bytes:
+        return False
+
+    trimmed = doc["_truncated"] = []
+    while (excess := _encoded_size(doc) + 1 - max_bytes) > 0:
+        fields = [key for key in doc if key not in ("_id", "_truncated")]
+        if not fields:
+            break
+        key = max(fields, key=lambda k: _encoded_size(doc[k]))
+        value = doc[key]
+        # At most half a field per step, so several large fields share the budget
+        keep = max(len(value) - excess, len(value) // 2) - 3 if isinstance(value, str) else 0
+        if keep > 0:
+            doc[key] = value[:keep] + "..."
+        elif isinstance(value, list) and len(value) > 1:
+            doc[key] = value[:len(value) // 2]
+        else:
+            del doc[key]
+        if key not in trimmed:
+            trimmed.append(key)
+    return True
+
+async def fetch_page(collection, query: dict, projection: dict | None, limit: int,
+                     cursor: str | None = None, max_bytes: int = MAX_RESPONSE_BYTES) -> dict[str, Any]:
+    """Fetches one page of documents using keyset pagination on `_id`.
+
+    The page stops early once the serialized documents would exceed
+    `max_bytes`; `next_cursor` then resumes from the last document returned.
+    A first document that is larger than the whole budget is shrunk with
+    `fit_document` rather than returned whole.
+
+    Args:
+        collection: Async collection to query.
+        query (dict): Filter document.
+        projection (dict | None): Projection document (`_id` is always returned).
+        limit (int): Maximum documents in the page, capped at `MAX_PAGE_SIZE`.
+        cursor (str, optional): Token from a previous page's `next_cursor`.
+        max_bytes (int, optional): Byte budget for the page.
+
+    Returns:
+        dict[str, Any]: `results`, `next_cursor` (None on the last page) and
+            `truncated` (True if the byte budget cut the page short or
+            shrank a document).
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        query = {"$and": [query, {"_id": {"$gt": decode_cursor(cursor)}}]}
+
+    # One extra document tells us whether there is another page
+    found = collection.find(query, projection).sort("_id", 1).limit(limit + 1)
+
+    results, size, last_id = [], 2, None
+    has_more, truncated = False, False
+    async for doc in found:
+        if len(results) == limit:
+            has_more = True
+            break
+
+        doc_id = doc["_id"]
+        doc["_id"] = str(doc_id)
+        doc_size = _encoded_size(doc) + 1
+        if size + doc_size > max_bytes:
+            if results:
+                has_more, truncated = True, True
+                break
+            truncated = fit_document(doc, max_bytes - size)
+            doc_size = _encoded_size(doc) + 1
+
+        results.append(doc)
+        size += doc_size
+        last_id = doc_id
+
+    return {
+        "results": results,
+        "next_cursor": encode_cursor(last_id) if has_more else None,
+        "truncated": truncated,
+    }
@@ -1,5 +1,6 @@
 import sys
 import os
+from contextlib import asynccontextmanager
 from typing import Dict, List, Any
 
 # Add the src directory to the Python path
@@ -7,27 +8,116 @@ src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
 
+# The repository store is built by the scraper tools in utils/
+utils_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'utils'))
+if utils_dir not in sys.path:
+    sys.path.insert(0, utils_dir)
+
+import asyncio
+import json
+import argparse
 from mcp.server.fastmcp import FastMCP
-from mongodb.mongo_client import get_db
+from mcp.types import ToolAnnotations
+from mongodb.mongo_client import LazyDatabase, warm_up, close_client
+from mongodb.paging import build_projection, fetch_page, fit_document, MAX_PAGE_SIZE, MAX_RESPONSE_BYTES
+from mongodb.distinct import DistinctService
+from mongodb.geo import GeoService
+from mongodb.aggregate import run_aggregate
+from instrumentation import traced
+from limits import ClientLimiter, LimitedFastMCP
+import repo_store
+import search_index
+import metadata_index
+
+# Set when serving over HTTP: the app, not each client session, owns the pool
+shared_server = False
+
+async def start_up():
+    """Warm the MongoDB connection pool and make sure lookup indexes exist."""
+    try:
+        await warm_up()
+        await distinct.ensure_indexes()
+        await theatre_geo.ensure_index()
+    except Exception as e:
+        # Tools still report connection errors individually
+        print(f"MongoDB warm-up failed: {e}", file=sys.stderr)
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Per-session lifespan: owns the pool for stdio, does nothing when shared."""
+    if shared_server:
+        yield
+        return
+    # Warm up in the background so the client's initialize isn't held up
+    # by DNS and TLS to the cluster; the first tool call joins the pool
+    warm = asyncio.create_task(start_up())
+    try:
+        yield
+    finally:
+        warm.cancel()
+        await asyncio.gather(warm, return_exceptions=True)
+        await close_client()
 
 # Create a server instance
-mcp = FastMCP(name="MyAssistantServer")
+mcp = LimitedFastMCP(name="MyAssistantServer", lifespan=lifespan, limiter=ClientLimiter())
+
+# The MongoDB database; the client is created on first use
+db = LazyDatabase()
+
+# Cached distinct values shared by the tools and resources below
+distinct = DistinctService(db)
 
-# Get the MongoDB database
-db = get_db()
+# Nearest / within-radius theatre lookups on the 2dsphere-indexed location
+theatre_geo = GeoService(db, "theaters", "location.geo")
+
+# Tools that only read data; agents may cache their results
+READ_ONLY = ToolAnnotations(readOnlyHint=True)
+
+# Default projections keep large text fields (plot, fullplot, cast) out of responses
+PARAM_DEFAULT_PROJECTION = {"fullplot": 0, "plot_embedding": 0}
+MOVIE_DEFAULT_PROJECTION = {
+    "title": 1, "year": 1, "genres": 1, "runtime": 1, "rated": 1,
+    "directors": 1, "imdb.rating": 1, "imdb.votes": 1,
+}
+THEATRE_DEFAULT_PROJECTION = {"theaterId": 1, "location.address": 1}
 
 # Helper functions
-def oid_to_str(doc: dict[str, Any]) -> dict[str, Any]:
-    """Converts MongoDB ObjectId to string in a document.
+
+# Opened on first use and reopened when the pack is rebuilt
+metadata_reader: metadata_index.MetadataReader | None = None
+
+def get_metadata_reader() -> metadata_index.MetadataReader:
+    """Returns the shared repos_metadata reader, reopening it if the pack changed."""
+    global metadata_reader
+    if metadata_reader is None or metadata_reader.is_stale():
+        if metadata_reader is not None:
+            metadata_reader.close()
+        metadata_reader = metadata_index.MetadataReader(metadata_index.pack_path)
+    return metadata_reader
+
+async def query_repo_store(func, *args, **kwargs) -> Dict[str, Any]:
+    """Runs a repo_store query on a worker thread with a read-only connection.
 
     Args:
-        doc (dict[str, Any]): A document from MongoDB.
+        func: A query function from `repo_store` taking the connection first.
 
     Returns:
-        dict[str, Any]: The document with ObjectId fields converted to strings.
+        Dict[str, Any]: The query's aggregate, or an `error` message.
     """
-    doc["_id"] = str(doc["_id"])
-    return doc
+    if not os.path.exists(repo_store.store_path):
+        return {"error": "Repository store not built; run `python utils/repo_store.py` after scraping."}
+
+    def run():
+        conn = repo_store.connect(repo_store.store_path, read_only=True)
+        try:
+            return func(conn, *args, **kwargs)
+        finally:
+            conn.close()
+
+    try:
+        return await asyncio.to_thread(run)
+    except Exception as e:
+        return {"error": str(e)}
 
 # Tools
 @mcp.tool()
@@ -39,170 +129,467 @@ def multiply(a: float, b: float) -> float:
 def greet(name: str) -> str:
     return f"Hello, {name}"
 
-@mcp.tool()
+@mcp.tool(annotations=READ_ONLY)
+@traced
 async def list_collections() -> Dict[str, List[str]]:
     """List all collections in the MongoDB database as JSON."""
     try:
-        return {"collections": db.list_collection_names()}
+        return {"collections": await db.list_collection_names()}
     except Exception as e:
         # still returns a JSON object with an error message
         return { "collections": [], "error": str(e) }
 
-@mcp.tool()
-async def get_param(var: str, num: int = 10) -> Dict[str, Any]:
-    """Get one parameter from the MongoDB mflix database."""
+@mcp.tool(annotations=READ_ONLY)
+@traced
+async def get_param(var: str, num: int = 10, fields: List[str] | None = None,
+                    cursor: str | None = None) -> Dict[str, Any]:
+    """Get one parameter from the MongoDB mflix database.
+
+    Args:
+        var (str): Collection to read from.
+        num (int, optional): Number of documents to show. Defaults to 10.
+        fields (List[str], optional): Fields to return, e.g. ["title", "year"].
+            Defaults to every field except bulky text and embeddings.
+        cursor (str, optional): `next_cursor` from a previous page.
+
+    Returns:
+        Dict[str, Any]: Page of documents with `next_cursor` and `truncated` flags.
+    """
     try:
-        collection = db[var]
-        cursor = collection.find().limit(num)
-        results = []
-        for doc in cursor:
-            doc = oid_to_str(doc)
-            results.append(doc)
-        return {"results": results}
+        projection = build_projection(fields, PARAM_DEFAULT_PROJECTION)
+        return await fetch_page(db[var], {}, projection, num, cursor)
 
     except Exception as e:
         return {"error": str(e)}
     
-@mcp.tool()
+@mcp.tool(annotations=READ_ONLY)
+@traced
 async def list_genres() -> Dict[str,List[str]]:
     """List all genres in the movies collection.
 
     Returns:
         List[str]: genres sorted alphabetically.
     """
-    movies = db["movies"]
-    genres = movies.distinct("genres")
-    return {"Genres":sorted(genres)}
+    return {"Genres": await distinct.values("movies", "genres")}
 
-@mcp.tool()
-async def get_movies_by_genre(genre: str, num: int = 10) -> List[Dict[str, Any]]:
+@mcp.tool(annotations=READ_ONLY)
+@traced
+async def get_movies_by_genre(genre: str, num: int = 10, fields: List[str] | None = None,
+                              cursor: str | None = None) -> Dict[str, Any]:
     """Get movies by genre.
 
     Args:
         genre (str): genre to filter movies by.
         num (int, optional): Number of movies to show. Defaults to 10.
+        fields (List[str], optional): Fields to return. Defaults to a compact
+            summary (title, year, genres, ratings) without plot or cast.
+        cursor (str, optional): `next_cursor` from a previous page.
 
     Returns:
-        List[Dict[str, Any]]: List of movie documents with the specified genre, limited to num results.
+        Dict[str, Any]: Page of movies with the specified genre, with `next_cursor` and `truncated` flags.
     """
     try:
-        movies = db["movies"]
-        cursor = movies.find({"genres": genre}).limit(num)
-        
-        results = []
-        for doc in cursor:
-            doc = oid_to_str(doc)
-            results.append(doc)
-        return results
+        projection = build_projection(fields, MOVIE_DEFAULT_PROJECTION)
+        return await fetch_page(db["movies"], {"genres": genre}, projection, num, cursor)
         
     except Exception as e:
         return {"error": str(e)}
 
-@mcp.tool()
+@mcp.tool(annotations=READ_ONLY)
+@traced
 async def get_theatre_states() -> Dict[str,List[str]]:
     """Get all unique theatre states from the theatres collection.
 
     Returns:
-        List[str]: List of unique theatre cities.
-    """
-    cursor = db.theaters.find(
-        {},
-        {"_id": 0, "location.address": 1, "location.geo.coordinates": 1}
-    )
-    locations = []
-    for doc in cursor:
-        loc = doc.get("location", {})
-        address = loc.get("address", {})
-        city = address.get("state")
-        if city and city not in locations:
-            locations.append(city)
-    return {"Locations":locations}
+        List[str]: Unique theatre states sorted alphabetically.
+    """
+    return {"Locations": await distinct.values("theaters", "location.address.state")}
             
-@mcp.tool()
-async def get_theatres_by_state(state: str) -> List[Dict[str, Any]]:
+@mcp.tool(annotations=READ_ONLY)
+@traced
+async def get_theatres_by_state(state: str, num: int = 50, fields: List[str] | None = None,
+                                cursor: str | None = None) -> Dict[str, Any]:
     """Get theatres by state.
 
     Args:
         state (str): State to filter theatres by.
+        num (int, optional): Number of theatres to show. Defaults to 50.
+        fields (List[str], optional): Fields to return. Defaults to the theatre ID and address.
+        cursor (str, optional): `next_cursor` from a previous page.
 
     Returns:
-        List[Dict[str, Any]]: List of theatre documents in the specified state.
+        Dict[str, Any]: Page of theatres in the specified state, with `next_cursor` and `truncated` flags.
     """
     try:
-        theatres = db["theaters"]
-        cursor = theatres.find({"location.address.state": state})
-        
-        results = []
-        for doc in cursor:
-            doc = oid_to_str(doc)
-            results.append(doc)
-        return results
+        projection = build_projection(fields, THEATRE_DEFAULT_PROJECTION)
+        return await fetch_page(db["theaters"], {"location.address.state": state}, projection, num, cursor)
         
     except Exception as e:
         return {"error": str(e)}
     
+@mcp.tool(annotations=READ_ONLY)
+@traced
+async def get_nearest_theatres(longitude: float, latitude: float, num: int = 10,
+                               max_distance_km: float | None = None,
+                               fields: List[str] | None = None) -> Dict[str, Any]:
+    """Get the theatres closest to a point, nearest first.
+
+    Args:
+        longitude (float): Longitude of the point, -180 to 180.
+        latitude (float): Latitude of the point, -90 to 90.
+        num (int, optional): Number of theatres to return, at most 100. Defaults to 10.
+        max_distance_km (float, optional): Ignore theatres further away than this.
+        fields (List[str], optional): Fields to return. Defaults to the theatre ID and address.
+
+    Returns:
+        Dict[str, Any]: `results`, each with its `distance_km` from the point.
+    """
+    try:
+        projection = build_projection(fields, THEATRE_DEFAULT_PROJECTION)
+        return await theatre_geo.near(longitude, latitude, num, max_distance_km, projection)
+
+    except Exception as e:
+        return {"error": str(e)}
+
+@mcp.tool(annotations=READ_ONLY)
+@traced
+async def get_theatres_within(longitude: float, latitude: float, radius_km: float, num: int = 20,
+                              fields: List[str] | None = None) -> Dict[str, Any]:
+    """Count theatres within a radius of a point and return some of them.
+
+    Args:
+        longitude (float): Longitude of the centre, -180 to 180.
+        latitude (float): Latitude of the centre, -90 to 90.
+        radius_km (float): Radius in kilometres.
+        num (int, optional): Number of theatres to return, at most 100. Defaults to 20.
+        fields (List[str], optional): Fields to return. Defaults to the theatre ID and address.
+
+    Returns:
+        Dict[str, Any]: `count` of all theatres in the radius and up to `num`
+            of them in `results` (unordered; use get_nearest_theatres for the closest).
+    """
+    try:
+        projection = build_projection(fields, THEATRE_DEFAULT_PROJECTION)
+        return await theatre_geo.within(longitude, latitude, radius_km, num, projection)
+
+    except Exception as e:
+        return {"error": str(e)}
+
 
 @mcp.resource("mongo://collections", name="ListCollections")
-def list_collections() -> list[str]:
+async def list_collections() -> list[str]:
     """Returns all collection names in the mflix database."""
-    db = get_db()
-    return sorted(db.list_collection_names())
+    return sorted(await db.list_collection_names())
 
 @mcp.resource("mongo://{collection}/distinct/{field}", name="DistinctValues")
-def distinct_values(collection: str, field: str) -> list:
+async def distinct_values(collection: str, field: str) -> list:
     """
     Returns the sorted list of distinct values for `field` in `collection`.
     Example URI: mongo://movies/distinct/genres
     """    
-    values = db[collection].distinct(field)
+    return await distinct.values(collection, field)
     
-    # drop nulls and sort if possible
-    cleaned = [v for v in values if v is not None]
+@mcp.tool(annotations=READ_ONLY)
+@traced
+async def aggregate(collection: str, pipeline: List[Dict[str, Any]], limit: int = 100,
+                    explain: bool = False) -> Dict[str, Any]:
+    """Run a read-only aggregation pipeline, e.g. counts per genre or average rating by year.
+
+    Prefer this over fetching raw documents when a question needs counts,
+    sums, averages or groupings.
+
+    Args:
+        collection (str): Collection to aggregate.
+        pipeline (List[Dict[str, Any]]): Stages from $match, $group, $sort, $limit,
+            $skip, $project, $addFields, $set, $unset, $unwind, $count, $bucket,
+            $bucketAuto, $sortByCount and $sample.
+        limit (int, optional): Maximum documents returned. Defaults to 100.
+        explain (bool, optional): Also return execution stats. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: `results` and `truncated`, plus `explain` stats if requested.
+    """
     try:
-        return sorted(cleaned)
-    except TypeError:
-        return cleaned
-    
-# @mcp.resource(
-#     "mongo://{collection}/query/{filter}/{projection}/{limit}",
-#     name="QueryCollection",
-#     description=(
-#         "Run a MongoDB query against `<collection>`.\n"
-#         "  • `filter` and `projection` are URL-encoded JSON strings.\n"
-#         "  • `limit` is the maximum number of docs to return.\n"
-#         "\n"
-#         "Example:\n"
-#         "  mongo://movies/query/%7B%22year%22%3A%7B%22%24gte%22%3A2000%7D%7D"
-#         "/%7B%22title%22%3A1%2C%22_year%22%3A1%7D/5"
-#     )
-# )
-# async def query_collection(
-#     collection: str,
-#     filter: str,
-#     projection: str,
-#     limit: str,
-#     ctx: Context
-# ) -> dict:
-#     """
-#     :param collection: name of the MongoDB collection
-#     :param filter:     URL-encoded JSON filter (e.g. {"year":{"$gte":2000}})
-#     :param projection: URL-encoded JSON projection (e.g. {"title":1,"_id":0})
-#     :param limit:      URL segment indicating how many docs to return
-#     """
-#     db = get_db()
-
-#     # Decode JSON from the URI segments
-#     filter_doc     = json.loads(unquote_plus(filter))
-#     proj_doc       = json.loads(unquote_plus(projection))
-#     limit_int      = int(limit)
-
-#     cursor = db[collection]\
-#         .find(filter_doc, proj_doc)\
-#         .limit(limit_int)
-
-#     results = [oid_to_str(doc) for doc in await cursor.to_list(length=limit_int)]
-#     return {collection: results}
+        return await run_aggregate(db, collection, pipeline, limit, explain)
+
+    except Exception as e:
+        return {"error": str(e)}
+
+@mcp.tool(annotations=READ_ONLY)
+@traced
+async def repo_overview() -> Dict[str, Any]:
+    """List scraped GitHub repositories with language, stars and item counts.
+
+    Returns:
+        Dict[str, Any]: `repos` keyed by owner/repo, with `scraped` counts of
+            commits, issues, prs and forks.
+    """
+    return await query_repo_store(repo_store.repo_overview)
+
+@mcp.tool(annotations=READ_ONLY)
+@traced
+async def count_repo_activity(kind: str, repo: str | None = None, state: str | None = None,
+                              author: str | None = None, label: str | None = None,
+                              date_field: str = "created", since: str | None = None,
+                              until: str | None = None, last_days: int | None = None) -> Dict[str, Any]:
+    """Count commits, issues, PRs or forks in the scraped GitHub data.
+
+    E.g. issues closed in the last 90 days:
+    kind="issues", state="closed", date_field="closed", last_days=90.
+
+    Args:
+        kind (str): One of "commits", "issues", "prs", "forks".
+        repo (str, optional): owner/repo or repo name. Defaults to all repos.
+        state (str, optional): "open" or "closed" (issues and prs).
+        author (str, optional): Commit author or issue/PR creator.
+        label (str, optional): Issue/PR label.
+        date_field (str, optional): Date the range applies to: "created",
+            "closed" (issues, prs) or "merged" (prs). Defaults to "created".
+        since (str, optional): ISO date, inclusive.
+        until (str, optional): ISO date, exclusive.
+        last_days (int, optional): Shortcut for since = now minus this many days.
+
+    Returns:
+        Dict[str, Any]: `count` and the range applied.
+    """
+    return await query_repo_store(repo_store.count, kind, repo, state, author, label,
+                                  date_field, since, until, last_days)
+
+@mcp.tool(annotations=READ_ONLY)
+@traced
+async def repo_activity_series(kind: str, bucket: str = "month", repo: str | None = None,
+                               state: str | None = None, author: str | None = None,
+                               label: str | None = None, date_field: str = "created",
+                               since: str | None = None, until: str | None = None,
+                               last_days: int | None = None) -> Dict[str, Any]:
+    """Counts per day, week, month or year for commits, issues, PRs or forks.
+
+    Args:
+        kind (str): One of "commits", "issues", "prs", "forks".
+        bucket (str, optional): "day", "week", "month" or "year". Defaults to "month".
+        repo, state, author, label, date_field, since, until, last_days:
+            Filters, as for `count_repo_activity`.
+
+    Returns:
+        Dict[str, Any]: `series` of [period, count] pairs in time order.
+    """
+    return await query_repo_store(repo_store.activity, kind, bucket, repo, state, author, label,
+                                  date_field, since, until, last_days)
+
+@mcp.tool(annotations=READ_ONLY)
+@traced
+async def top_repo_contributors(kind: str = "commits", repo: str | None = None,
+                                state: str | None = None, label: str | None = None,
+                                date_field: str = "created", since: str | None = None,
+                                until: str | None = None, last_days: int | None = None,
+                                num: int = 10) -> Dict[str, Any]:
+    """Top authors of commits, or creators of issues or PRs.
+
+    Args:
+        kind (str, optional): "commits", "issues" or "prs". Defaults to "commits".
+        repo, state, label, date_field, since, until, last_days:
+            Filters, as for `count_repo_activity`.
+        num (int, optional): Number of contributors to return. Defaults to 10.
+
+    Returns:
+        Dict[str, Any]: `contributors` as [login, count] pairs, most active first.
+    """
+    return await query_repo_store(repo_store.top_contributors, kind, repo, state, label,
+                                  date_field, since, until, last_days, max(1, min(num, 100)))
+
+@mcp.tool(annotations=READ_ONLY)
+@traced
+async def search_repo_text(query: str, repo: str | None = None, kinds: List[str] | None = None,
+                           match_all: bool = False, k: int = 10) -> Dict[str, Any]:
+    """Full-text search over scraped READMEs, issues, PRs and commit messages.
+
+    Ranked by BM25 with word stemming; use it to find whether and where a
+    topic (e.g. "deprecation", "maintainer burnout") is discussed instead of
+    reading whole files.
+
+    Args:
+        query (str): Words to search for; wrap a phrase in double quotes.
+        repo (str, optional): owner/repo or repo name. Defaults to all repos.
+        kinds (List[str], optional): Any of "readme", "issues", "prs",
+            "commits". Defaults to all.
+        match_all (bool, optional): Require every word or phrase. Defaults to
+            False (any word; documents matching more rank higher).
+        k (int, optional): Results to return, at most 50. Defaults to 10.
+
+    Returns:
+        Dict[str, Any]: `results` with repo, kind, ref (issue/PR number or
+            commit sha), date, title, a `snippet` with matches in **bold**,
+            and `score` (higher is better).
+    """
+    if not os.path.exists(search_index.index_path):
+        return {"error": "Search index not built; run `python utils/search_index.py` after scraping."}
+
+    def run():
+        conn = search_index.connect(search_index.index_path, read_only=True)
+        try:
+            return search_index.search(conn, query, repo, kinds, k, match_all)
+        finally:
+            conn.close()
+
+    try:
+        return await asyncio.to_thread(run)
+    except Exception as e:
+        return {"error": str(e)}
+
+@mcp.tool(annotations=READ_ONLY)
+@traced
+async def repo_metadata(repo: str, section: str | None = None, start: int = 0, num: int = 20,
+                        fields: List[str] | None = None) -> Dict[str, Any]:
+    """Metadata for one repository from repos_metadata, or a page of its history.
+
+    Without `section`, returns the repo's fields (stars, forks, license,
+    topics, dates, ...) and how many commits, issues and PRs are stored.
+    With `section`, returns items from that list, `num` at a time.
+
+    Args:
+        repo (str): owner/repo or repo name.
+        section (str, optional): "commits", "issues" or "prs".
+        start (int, optional): Index of the first item to return. Defaults to 0.
+        num (int, optional): Items per page, at most 100. Defaults to 20.
+        fields (List[str], optional): Item fields to keep (e.g. ["number", "title", "state"]).
+
+    Returns:
+        Dict[str, Any]: `repo` and `counts`, plus `header` or, for a section,
+            `results` and `next_start` (None on the last page). `truncated`
+            is set when an item too large for one response was shortened.
+    """
+    if not os.path.exists(metadata_index.index_path_for(metadata_index.pack_path)):
+        return {"error": "Metadata pack not built; run `python utils/metadata_index.py`."}
+
+    try:
+        reader = get_metadata_reader()
+        full_name = reader.resolve(repo)
+        if full_name is None:
+            return {"error": f"No metadata for {repo}"}
+        result = {"repo": full_name, "counts": reader.counts(full_name)}
+        if section is None:
+            result["header"] = reader.header(full_name)
+            return result
+        if section not in result["counts"]:
+            return {"error": f"section must be one of {', '.join(result['counts'])}"}
+        if start < 0:
+            return {"error": "start must be 0 or more"}
+
+        # Lines are the items' JSON, so their length is the response budget
+        limit = max(1, min(num, MAX_PAGE_SIZE))
+        results, size, truncated = [], 2, False
+        for line in reader.iter_lines(full_name, section, start):
+            item = json.loads(line)
+            if fields:
+                item = {key: item[key] for key in fields if key in item}
+                item_size = len(json.dumps(item, default=str)) + 1
+            else:
+                item_size = len(line)
+            if len(results) == limit or (results and size + item_size > MAX_RESPONSE_BYTES):
+                break
+            if size + item_size > MAX_RESPONSE_BYTES:
+                # A single item larger than the budget is shrunk, not returned whole
+                truncated = fit_document(item, MAX_RESPONSE_BYTES - size)
+                item_size = len(json.dumps(item, default=str)) + 1
+            results.append(item)
+            size += item_size
+
+        end = start + len(results)
+        result["results"] = results
+        result["next_start"] = end if end < result["counts"][section] else None
+        if truncated:
+            result["truncated"] = True
+        return result
+    except Exception as e:
+        return {"error": str(e)}
+
+@mcp.tool(annotations=READ_ONLY)
+@traced
+async def repo_health_features(repo: str) -> Dict[str, Any]:
+    """Precomputed health features for one scraped GitHub repository.
+
+    Covers commit cadence, issue close latency, PR merge rate, bus factor
+    and fork growth; use these rather than computing statistics from raw
+    commits, issues or PRs.
+
+    Args:
+        repo (str): owner/repo or repo name.
+
+    Returns:
+        Dict[str, Any]: `repo` and its `features` (days are relative to the
+            repo's latest observed activity).
+    """
+    # NumPy is only loaded once features are actually asked for
+    import repo_features
+
+    name = repo.strip("/").split("/")[-1]
+    repo_dir = os.path.join(repo_features.data_root, name)
+    if not os.path.isdir(repo_dir):
+        return {"error": f"No scraped data for {repo}"}
+
+    try:
+        def compute():
+            summary = repo_features.load_summaries().get(name)
+            result = repo_features.repo_features(repo_dir, summary)
+            return {"repo": result["repo"], "features": result["features"]}
+        return await asyncio.to_thread(compute)
+    except Exception as e:
+        return {"error": str(e)}
+
+async def serve_http(transport: str, host: str, port: int, shutdown_timeout: float):
+    """Serve every client from this one process over streamable HTTP or SSE.
+
+    The MongoDB pool and distinct-value cache are warmed once and shared by
+    all sessions. On SIGINT/SIGTERM uvicorn stops accepting connections and
+    waits up to `shutdown_timeout` seconds for in-flight calls before the
+    pool is closed.
+    """
+    import uvicorn
+
+    global shared_server
+    shared_server = True
+
+    app = mcp.streamable_http_app() if transport == "streamable-http" else mcp.sse_app()
+    session_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def app_lifespan(app):
+        await start_up()
+        try:
+            async with session_lifespan(app):
+                yield
+        finally:
+            await close_client()
+
+    app.router.lifespan_context = app_lifespan
+    config = uvicorn.Config(app, host=host, port=port, log_level=mcp.settings.log_level.lower(),
+                            timeout_graceful_shutdown=shutdown_timeout)
+    await uvicorn.Server(config).serve()
+
+def main():
+    """Parse the command line and serve over stdio (default), streamable HTTP or SSE."""
+    parser = argparse.ArgumentParser(description="Run the MCP server.")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http", "sse"],
+                        default=os.environ.get("MCP_TRANSPORT", "stdio"))
+    parser.add_argument("--host", default=os.environ.get("MCP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MCP_PORT", "8000")))
+    parser.add_argument("--max-client-concurrency", type=int, default=mcp.limiter.max_concurrency,
+                        help="Concurrent tool calls per client (0 for no limit)")
+    parser.add_argument("--shutdown-timeout", type=float,
+                        default=float(os.environ.get("MCP_SHUTDOWN_TIMEOUT", "10")),
+                        help="Seconds to let in-flight calls finish on shutdown")
+    args = parser.parse_args()
+
+    mcp.limiter.max_concurrency = args.max_client_concurrency
+    if args.transport == "stdio":
+        mcp.run()
+    else:
+        mcp.settings.host, mcp.settings.port = args.host, args.port
+        try:
+            asyncio.run(serve_http(args.transport, args.host, args.port, args.shutdown_timeout))
+        except KeyboardInterrupt:
+            # uvicorn re-raises SIGINT after its graceful shutdown has finished
+            pass
 
 if __name__ == "__main__":
-    mcp.run()
-    
\ No newline at end of file
+    main()
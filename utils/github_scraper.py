@@ -1,17 +1,32 @@
 import os
 import sys
 import json
+import time
+import threading
 import requests
-from datetime import datetime
-from urllib.parse import urlparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlparse, parse_qs
+from requests.adapters import HTTPAdapter
+from jsonl_store import JsonlWriter, append_line, artifact_path, convert_legacy, iter_items
 
 # -------------------------------------------------------------------------
 # GitHub Repo Metadata & Activity Scraper with Duplication Checks
 # -------------------------------------------------------------------------
 
 # Constants for paths
-data_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
-summary_file = os.path.join(data_root, 'database_summary.json')
+data_root = os.getenv('SCRAPER_DATA_DIR', os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data')))
+summary_file = os.path.join(data_root, 'database_summary.jsonl')
+
+# API roots are configurable so the scraper can run against a local stand-in server
+api_root = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+raw_root = os.getenv('GITHUB_RAW_URL', 'https://raw.githubusercontent.com').rstrip('/')
+
+# Concurrency and retry settings
+per_page = 100
+page_workers = int(os.getenv('SCRAPER_PAGE_WORKERS', '8'))
+max_retries = 5
 
 # Parse owner and repo from URL
 def parse_github_url(repo_url):
@@ -27,29 +42,125 @@ def ensure_repo_dir(repo_name):
     os.makedirs(repo_dir, exist_ok=True)
     return repo_dir
 
+# Names already in the summary, loaded once per process so each append is O(1)
+summary_lock = threading.Lock()
+summary_names = None
+
+def _load_summary_names():
+    global summary_names
+    if summary_names is None:
+        legacy = os.path.join(data_root, 'database_summary.json')
+        if os.path.exists(legacy) and not os.path.exists(summary_file):
+            convert_legacy(legacy)
+        summary_names = {repo.get('full_name') for repo in iter_items(data_root, summary_file)}
+    return summary_names
+
 # Append summary if not already present
 def append_summary(entry):
-    existing = []
-    if os.path.exists(summary_file):
-        try:
-            with open(summary_file, 'r', encoding='utf-8') as f:
-                existing = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            existing = []
-    # Check for duplicate by full_name
-    if any(repo.get('full_name') == entry['full_name'] for repo in existing):
-        print(f"Summary for {entry['full_name']} already exists; skipping append.")
-        return
-    existing.append(entry)
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        json.dump(existing, f, indent=2, ensure_ascii=False)
-    print(f"Appended summary for {entry['full_name']} to database_summary.json")
+    with summary_lock:
+        names = _load_summary_names()
+        # Check for duplicate by full_name
+        if entry['full_name'] in names:
+            print(f"Summary for {entry['full_name']} already exists; skipping append.")
+            return
+        append_line(summary_file, entry)
+        names.add(entry['full_name'])
+    print(f"Appended summary for {entry['full_name']} to database_summary.jsonl")
+
+# Shares GitHub rate-limit state across worker threads. An optional
+# `requests_per_hour` budget spaces requests evenly across all of them.
+class RateLimiter:
+    def __init__(self, min_remaining=5, max_backoff=300, requests_per_hour=None):
+        self.lock = threading.Lock()
+        self.min_remaining = min_remaining
+        self.max_backoff = max_backoff
+        self.resume_at = 0.0
+        self.backoff = 1.0
+        self.interval = 3600 / requests_per_hour if requests_per_hour else 0
+        self.next_slot = 0.0
+        self.requests = 0
+
+    # Block until any pause has passed and a budget slot is free
+    def wait(self):
+        while True:
+            with self.lock:
+                now = time.time()
+                delay = self.resume_at - now
+                if delay <= 0:
+                    slot = max(self.next_slot, now)
+                    self.next_slot = slot + self.interval
+                    self.requests += 1
+                    delay = slot - now
+                    break
+            time.sleep(min(delay, 60))
+        if delay > 0:
+            time.sleep(delay)
+
+    def _pause(self, delay):
+        with self.lock:
+            self.resume_at = max(self.resume_at, time.time() + delay)
+
+    # Pause everyone before the primary limit runs out
+    def update(self, resp):
+        remaining = resp.headers.get('X-RateLimit-Remaining')
+        reset = resp.headers.get('X-RateLimit-Reset')
+        if remaining is not None and reset is not None and int(remaining) <= self.min_remaining:
+            print(f"Rate limit nearly exhausted; pausing until {datetime.fromtimestamp(int(reset))}")
+            self._pause(int(reset) - time.time() + 1)
+        if resp.status_code < 400:
+            with self.lock:
+                self.backoff = max(1.0, self.backoff / 2)
+
+    # Back off after a rate-limited or failed response
+    def throttle(self, resp):
+        retry_after = resp.headers.get('Retry-After')
+        reset = resp.headers.get('X-RateLimit-Reset')
+        if retry_after is not None:
+            delay = float(retry_after)
+        elif resp.headers.get('X-RateLimit-Remaining') == '0' and reset is not None:
+            delay = int(reset) - time.time() + 1
+        else:
+            with self.lock:
+                delay = self.backoff
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+        self._pause(max(delay, 0))
+
+# Pooled HTTP session shared by all workers
+def make_session(token=None, pool_size=page_workers * 2):
+    session = requests.Session()
+    session.headers['Accept'] = 'application/vnd.github.v3+json'
+    if token:
+        session.headers['Authorization'] = f"token {token}"
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# GET with rate-limit handling; returns None on a non-retryable failure.
+# A 304 response (from a conditional request with `etag`) is returned as-is.
+def github_get(session, url, limiter, params=None, etag=None):
+    headers = {'If-None-Match': etag} if etag else None
+    for _ in range(max_retries):
+        limiter.wait()
+        resp = session.get(url, params=params, headers=headers)
+        limiter.update(resp)
+        if resp.status_code in (200, 304):
+            return resp
+        rate_limited = resp.status_code == 429 or (
+            resp.status_code == 403 and (
+                'Retry-After' in resp.headers or resp.headers.get('X-RateLimit-Remaining') == '0'))
+        if rate_limited or resp.status_code >= 500:
+            limiter.throttle(resp)
+            continue
+        return None
+    return None
 
 # Fetch repository summary metadata
-def fetch_repo_metadata(owner, repo, headers):
-    url = f"https://api.github.com/repos/{owner}/{repo}"
-    resp = requests.get(url, headers=headers)
-    resp.raise_for_status()
+def fetch_repo_metadata(session, owner, repo, limiter):
+    url = f"{api_root}/repos/{owner}/{repo}"
+    resp = github_get(session, url, limiter)
+    if resp is None:
+        raise RuntimeError(f"Could not fetch metadata for {owner}/{repo}")
     data = resp.json()
     return {
         "full_name": data.get("full_name"),
@@ -70,22 +181,107 @@ def fetch_repo_metadata(owner, repo, headers):
         "default_branch": data.get("default_branch")
     }
 
-# Generic fetcher for paginated endpoints
-def fetch_paginated(owner, repo, headers, endpoint, item_mapper):
-    items = []
-    page = 1
-    while True:
-        url = f"https://api.github.com/repos/{owner}/{repo}/{endpoint}"
-        resp = requests.get(url, headers=headers, params={"state": "all", "per_page": 100, "page": page})
-        if resp.status_code != 200:
-            break
+# Page number of the rel="last" link, if the response has one
+def last_page(resp):
+    last = resp.links.get('last', {}).get('url')
+    if not last:
+        return None
+    return int(parse_qs(urlparse(last).query).get('page', ['1'])[0])
+
+# Yield (page, items) in order, fetching later pages in parallel once the
+# Link header reveals the last page. With `etag`, the first page is a
+# conditional request. `meta` receives the ETag, whether it was a 304, the
+# last page number, and `complete` once every page has been fetched.
+# Pages in `skip_pages` are not yielded; if page 1 is skipped, `last` must be
+# given so the first request can be skipped too (used to resume checkpoints).
+def iter_pages(session, owner, repo, endpoint, limiter, params=None, workers=page_workers,
+               etag=None, meta=None, skip_pages=(), last=None):
+    url = f"{api_root}/repos/{owner}/{repo}/{endpoint}"
+    params = {"state": "all", "per_page": per_page, **(params or {})}
+    meta = {} if meta is None else meta
+    meta['complete'] = False
+    skip_pages = set(skip_pages)
+
+    def get(page):
+        resp = github_get(session, url, limiter, params=dict(params, page=page))
+        return resp.json() if resp is not None else None
+
+    if last is None or 1 not in skip_pages:
+        resp = github_get(session, url, limiter, params=dict(params, page=1), etag=etag)
+        if resp is None:
+            return
+        meta['etag'] = resp.headers.get('ETag')
+        meta['not_modified'] = resp.status_code == 304
+        if meta['not_modified']:
+            meta['complete'] = True
+            return
         batch = resp.json()
+        last = last_page(resp)
+        meta['last'] = last
         if not batch:
-            break
-        for item in batch:
-            items.append(item_mapper(item))
-        page += 1
-    return items
+            meta['complete'] = True
+            return
+        if 1 not in skip_pages:
+            yield 1, batch
+
+        if last is None:
+            # No Link header: single page, or follow rel="next" one at a time
+            page = 2
+            while 'next' in resp.links:
+                resp = github_get(session, url, limiter, params=dict(params, page=page))
+                if resp is None:
+                    return
+                if not resp.json():
+                    break
+                if page not in skip_pages:
+                    yield page, resp.json()
+                page += 1
+            meta['complete'] = True
+            return
+    else:
+        meta['last'] = last
+
+    # Keep a bounded window of pages in flight so memory stays flat
+    remaining = deque(page for page in range(2, last + 1) if page not in skip_pages)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        try:
+            while remaining or pending:
+                while remaining and len(pending) < workers * 2:
+                    page = remaining.popleft()
+                    pending.append((page, pool.submit(get, page)))
+                page, future = pending.popleft()
+                batch = future.result()
+                if batch is None:
+                    return
+                if not batch:
+                    # Items were removed since page 1 was read
+                    break
+                yield page, batch
+        finally:
+            for _, future in pending:
+                future.cancel()
+    meta['complete'] = True
+
+# Generic fetcher for paginated endpoints, streaming pages to a JSONL file
+# An incomplete fetch (a page failed after its retries) is discarded rather
+# than saved, since an existing file is never refetched
+def fetch_paginated(session, owner, repo, endpoint, item_mapper, limiter, path):
+    meta = {}
+    writer = JsonlWriter(path)
+    try:
+        for _, batch in iter_pages(session, owner, repo, endpoint, limiter, meta=meta):
+            writer.write_many(item_mapper(item) for item in batch)
+    except BaseException:
+        writer.abort()
+        raise
+    if not meta.get('complete'):
+        writer.abort()
+        print(f"{os.path.basename(path)}: incomplete fetch, not saved")
+        return 0
+    writer.close()
+    print(f"Wrote {os.path.basename(path)}")
+    return writer.count
 
 # Mappers for commits, issues, prs, forks
 commit_mapper = lambda c: {
@@ -107,51 +303,211 @@ fork_mapper = lambda f: {
     'html_url': f.get('html_url'), 'created_at': f.get('created_at')
 }
 
+# Output file -> (API endpoint, mapper)
+endpoint_files = {
+    'commits.jsonl': ('commits', commit_mapper),
+    'issues.jsonl': ('issues', issue_mapper),
+    'prs.jsonl': ('pulls', pr_mapper),
+    'forks.jsonl': ('forks', fork_mapper),
+}
+
 # Fetch README by raw markdown
-def fetch_readme(owner, repo, branch):
-    raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/README.md"
-    resp = requests.get(raw_url)
+def fetch_readme(session, owner, repo, branch):
+    raw_url = f"{raw_root}/{owner}/{repo}/{branch}/README.md"
+    resp = session.get(raw_url)
     return resp.text if resp.status_code == 200 else ''
 
 # Write file if not exists
-def write_file_if_missing(data, path, is_json=True):
+def write_file_if_missing(data, path):
     if os.path.exists(path):
         print(f"File {os.path.basename(path)} already exists; skipping.")
         return
     with open(path, 'w', encoding='utf-8') as f:
-        if is_json:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        else:
-            f.write(data)
+        f.write(data)
     print(f"Wrote {os.path.basename(path)}")
 
+# -------------------------------------------------------------------------
+# Incremental sync: per-endpoint ETags and since-cursors in sync_state.json
+# -------------------------------------------------------------------------
+
+# How each endpoint is synced:
+#   key     - field that identifies an item for merging
+#   stamp   - cursor value of a raw API item
+#   seed    - mapped fields used to seed the cursor from files scraped before syncing existed
+#   since   - endpoint accepts `since=`; otherwise pages are sorted newest first
+#             and paging stops once items are older than the cursor
+sync_specs = {
+    'commits.jsonl': {
+        'endpoint': 'commits', 'mapper': commit_mapper, 'key': 'sha', 'since': True,
+        'stamp': lambda c: ((c.get('commit') or {}).get('committer') or {}).get('date'),
+        'seed': ('date',),
+    },
+    'issues.jsonl': {
+        'endpoint': 'issues', 'mapper': issue_mapper, 'key': 'id', 'since': True,
+        'stamp': lambda i: i.get('updated_at'),
+        'seed': ('created_at', 'closed_at'),
+    },
+    'prs.jsonl': {
+        'endpoint': 'pulls', 'mapper': pr_mapper, 'key': 'id', 'since': False,
+        'params': {'sort': 'updated', 'direction': 'desc'},
+        'stamp': lambda p: p.get('updated_at'),
+        'seed': ('created_at', 'closed_at', 'merged_at'),
+    },
+    'forks.jsonl': {
+        'endpoint': 'forks', 'mapper': fork_mapper, 'key': 'id', 'since': False,
+        'params': {'sort': 'newest'},
+        'stamp': lambda f: f.get('created_at'),
+        'seed': ('created_at',),
+    },
+}
+
+def load_sync_state(repo_dir):
+    path = os.path.join(repo_dir, 'sync_state.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_sync_state(repo_dir, state):
+    path = os.path.join(repo_dir, 'sync_state.json')
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+# New items first (the API's newest-first order), then the existing items
+# streamed from disk minus the ones replaced by key. Only the updates are
+# held in memory. A legacy .json file is replaced by the JSONL output.
+def merge_items(repo_dir, filename, updates, key):
+    updated_keys = {item.get(key) for item in updates}
+    existing_path = artifact_path(repo_dir, filename)
+    with JsonlWriter(os.path.join(repo_dir, filename)) as writer:
+        writer.write_many(updates)
+        writer.write_many(item for item in iter_items(repo_dir, filename) if item.get(key) not in updated_keys)
+    if existing_path and existing_path != writer.path:
+        os.remove(existing_path)
+    return writer.count
+
+# Fetch only what changed since the last sync and merge it into the existing file
+def sync_endpoint(session, owner, repo, repo_dir, filename, limiter, state):
+    spec = sync_specs[filename]
+    endpoint_state = state.get(spec['endpoint'], {})
+
+    cursor = endpoint_state.get('since')
+    if cursor is None:
+        stamps = (item.get(field) for item in iter_items(repo_dir, filename) for field in spec['seed'])
+        cursor = max(filter(None, stamps), default=None)
+
+    params = dict(spec.get('params', {}))
+    if spec['since'] and cursor:
+        params['since'] = cursor
+
+    meta, updates, newest = {}, [], cursor
+    reached_cursor = False
+    # Sorted endpoints stop early, so don't prefetch many pages past the cursor
+    workers = page_workers if spec['since'] or cursor is None else 1
+    for _, batch in iter_pages(session, owner, repo, spec['endpoint'], limiter, params=params,
+                               workers=workers, etag=endpoint_state.get('etag'), meta=meta):
+        for raw in batch:
+            stamp = spec['stamp'](raw)
+            if not spec['since'] and cursor and stamp and stamp < cursor:
+                reached_cursor = True
+                break
+            updates.append(spec['mapper'](raw))
+            if stamp and (newest is None or stamp > newest):
+                newest = stamp
+        if reached_cursor:
+            break
+
+    if meta.get('complete') or reached_cursor:
+        state[spec['endpoint']] = {
+            'etag': meta.get('etag') or endpoint_state.get('etag'),
+            'since': newest,
+            'synced_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        }
+    else:
+        # A page failed: merge what arrived, but keep the old cursor and
+        # ETag so the next sync fetches the missing items again
+        print(f"{filename}: incomplete fetch, cursor not advanced")
+    if meta.get('not_modified') or not updates:
+        print(f"{filename}: no changes")
+        return 0
+
+    total = merge_items(repo_dir, filename, updates, spec['key'])
+    print(f"{filename}: merged {len(updates)} new or changed items ({total} total)")
+    return len(updates)
+
+# Replace an existing summary entry (sync mode) or append a new one
+def upsert_summary(entry):
+    with summary_lock:
+        _load_summary_names().add(entry['full_name'])
+        with JsonlWriter(summary_file) as writer:
+            writer.write_many(repo for repo in iter_items(data_root, summary_file)
+                              if repo.get('full_name') != entry['full_name'])
+            writer.write(entry)
+    print(f"Updated summary for {entry['full_name']} in database_summary.jsonl")
+
+def sync_repo(session, owner, repo, limiter):
+    repo_dir = ensure_repo_dir(repo)
+    state = load_sync_state(repo_dir)
+
+    summary = fetch_repo_metadata(session, owner, repo, limiter)
+    upsert_summary(summary)
+
+    with ThreadPoolExecutor(max_workers=len(sync_specs) + 1) as pool:
+        futures = [
+            pool.submit(sync_endpoint, session, owner, repo, repo_dir, filename, limiter, state)
+            for filename in sync_specs
+        ]
+        readme = pool.submit(fetch_readme, session, owner, repo, summary['default_branch'])
+        for future in futures:
+            future.result()
+
+        text = readme.result()
+        readme_path = os.path.join(repo_dir, 'readme.md')
+        if text and (not os.path.exists(readme_path) or open(readme_path, encoding='utf-8').read() != text):
+            with open(readme_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            print("readme.md: updated")
+
+    save_sync_state(repo_dir, state)
+    print(f"Data for {repo} synced in {repo_dir}")
+
 # Main
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print("Usage: python scrape_github.py <github_repo_url>")
+    args = [arg for arg in sys.argv[1:] if arg != '--sync']
+    if len(args) != 1:
+        print("Usage: python github_scraper.py <github_repo_url> [--sync]")
         sys.exit(1)
-    owner, repo = parse_github_url(sys.argv[1])
-    token = os.getenv('GITHUB_TOKEN')
-    headers = {'Accept': 'application/vnd.github.v3+json'}
-    if token:
-        headers['Authorization'] = f"token {token}"
+    owner, repo = parse_github_url(args[0])
+    session = make_session(os.getenv('GITHUB_TOKEN'))
+    limiter = RateLimiter()
+
+    # Incremental refresh of an existing (or new) repo
+    if '--sync' in sys.argv:
+        sync_repo(session, owner, repo, limiter)
+        sys.exit(0)
 
     repo_dir = ensure_repo_dir(repo)
 
     # Summary
-    summary = fetch_repo_metadata(owner, repo, headers)
+    summary = fetch_repo_metadata(session, owner, repo, limiter)
     append_summary(summary)
 
-    # Details
-    write_file_if_missing(fetch_paginated(owner, repo, headers, 'commits', commit_mapper),
-                          os.path.join(repo_dir, 'commits.json'))
-    write_file_if_missing(fetch_paginated(owner, repo, headers, 'issues', issue_mapper),
-                          os.path.join(repo_dir, 'issues.json'))
-    write_file_if_missing(fetch_paginated(owner, repo, headers, 'pulls', pr_mapper),
-                          os.path.join(repo_dir, 'prs.json'))
-    write_file_if_missing(fetch_paginated(owner, repo, headers, 'forks', fork_mapper),
-                          os.path.join(repo_dir, 'forks.json'))
-    write_file_if_missing(fetch_readme(owner, repo, summary['default_branch']),
-                          os.path.join(repo_dir, 'readme.md'), is_json=False)
+    # Details: endpoints are fetched concurrently, each with parallel pages
+    endpoints = endpoint_files
+    with ThreadPoolExecutor(max_workers=len(endpoints) + 1) as pool:
+        futures = []
+        for filename, (endpoint, mapper) in endpoints.items():
+            existing = artifact_path(repo_dir, filename)
+            if existing:
+                print(f"File {os.path.basename(existing)} already exists; skipping.")
+                continue
+            path = os.path.join(repo_dir, filename)
+            futures.append(pool.submit(fetch_paginated, session, owner, repo, endpoint, mapper, limiter, path))
+        readme = pool.submit(fetch_readme, session, owner, repo, summary['default_branch'])
+
+        for future in futures:
+            future.result()
+        write_file_if_missing(readme.result(), os.path.join(repo_dir, 'readme.md'))
 
     print(f"Data for {repo} processed in {repo_dir}")
@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import threading
+from datetime import datetime, timezone
+
+# -------------------------------------------------------------------------
+# Streaming JSONL artifacts with a per-directory manifest
+# -------------------------------------------------------------------------
+#
+# Each artifact (e.g. commits.jsonl) holds one item per line and is written
+# page by page as the data arrives, so memory stays flat however long a
+# repo's history is. The directory's manifest.json records, per artifact,
+# the item count, size and a sparse index of byte offsets (one every
+# `index_every` items) so readers can start part-way through a file.
+
+manifest_name = 'manifest.json'
+index_every = 1000
+
+_manifest_lock = threading.Lock()
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def load_manifest(directory):
+    path = os.path.join(directory, manifest_name)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# Record one artifact's entry; callers in different threads share the lock
+def update_manifest(directory, name, entry):
+    with _manifest_lock:
+        manifest = load_manifest(directory)
+        if entry is None:
+            manifest.pop(name, None)
+        else:
+            manifest[name] = entry
+        path = os.path.join(directory, manifest_name)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+# Writes items to `<path>.tmp` and moves it into place on close, so a file
+# that exists is always complete. Use as a context manager; an exception
+# inside the block discards the partial file.
+class JsonlWriter:
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.index = []
+        self.file = open(path + '.tmp', 'w', encoding='utf-8')
+
+    def write(self, item):
+        if self.count % index_every == 0:
+            self.index.append([self.count, self.file.tell()])
+        self.file.write(json.dumps(item, ensure_ascii=False))
+        self.file.write('\n')
+        self.count += 1
+
+    def write_many(self, items):
+        for item in items:
+            self.write(item)
+
+    def close(self):
+        size = self.file.tell()
+        self.file.close()
+        os.replace(self.path + '.tmp', self.path)
+        directory, name = os.path.split(self.path)
+        update_manifest(directory, name, {
+            'items': self.count, 'bytes': size, 'index': self.index, 'written_at': _now(),
+        })
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.path + '.tmp')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+# Append single lines to an existing JSONL file (e.g. the database summary)
+def append_line(path, item):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(item, ensure_ascii=False))
+        f.write('\n')
+
+# Lazily yield items, starting at item `start` via the manifest's offset index
+def iter_jsonl(path, start=0):
+    offset, skip = 0, start
+    if start:
+        directory, name = os.path.split(path)
+        for item_number, item_offset in load_manifest(directory).get(name, {}).get('index', []):
+            if item_number > start:
+                break
+            offset, skip = item_offset, start - item_number
+
+    with open(path, 'r', encoding='utf-8') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.strip():
+                continue
+            if skip:
+                skip -= 1
+                continue
+            yield json.loads(line)
+
+# Path of an artifact, preferring the JSONL form over a legacy .json file
+def artifact_path(directory, name):
+    stem = os.path.splitext(name)[0]
+    for candidate in (f'{stem}.jsonl', f'{stem}.json'):
+        path = os.path.join(directory, candidate)
+        if os.path.exists(path):
+            return path
+    return None
+
+# Iterate an artifact in either format; legacy .json files are loaded whole
+def iter_items(directory, name, start=0):
+    path = artifact_path(directory, name)
+    if path is None:
+        return
+    if path.endswith('.jsonl'):
+        yield from iter_jsonl(path, start)
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from json.load(f)[start:]
+
+# Convert one legacy .json list to JSONL next to it and remove the original
+def convert_legacy(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        return None
+    with JsonlWriter(os.path.splitext(path)[0] + '.jsonl') as writer:
+        writer.write_many(data)
+    os.remove(path)
+    return writer.count
+
+# Convert every legacy .json artifact under `root`
+def migrate(root):
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if not name.endswith('.json') or name in (manifest_name, 'sync_state.json', 'scrape_checkpoint.json'):
+                continue
+            path = os.path.join(directory, name)
+            count = convert_legacy(path)
+            if count is not None:
+                print(f"Converted {os.path.relpath(path, root)} ({count} items)")
+
+# Main
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python jsonl_store.py <data_dir>")
+        sys.exit(1)
+    migrate(sys.argv[1])
@@ -0,0 +1,233 @@
+import os
+import json
+import mmap
+import argparse
+from jsonl_store import index_every, artifact_path, iter_items
+
+# -------------------------------------------------------------------------
+# Sidecar-indexed, memory-mapped repos_metadata
+# -------------------------------------------------------------------------
+#
+# repos_metadata.json keeps every repo's commit/issue/PR history inline in
+# one JSON array, so reading one repo means parsing the whole file. The
+# packed form is a JSONL file laid out repo by repo: a header line with the
+# repo's scalar fields, then one line per item of each section. A sidecar
+# index maps `full_name` to the byte range of the header and of each section
+# (plus a sparse per-item offset index, as in jsonl_store), so the reader
+# mmaps the pack and decodes only the lines a lookup asks for.
+
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+data_root = os.getenv('SCRAPER_DATA_DIR', os.path.join(root_dir, 'data'))
+source_path = os.path.join(root_dir, 'repos_metadata.json')
+pack_path = os.getenv('REPOS_METADATA_PATH', os.path.join(root_dir, 'repos_metadata.jsonl'))
+
+index_version = 1
+# List fields stored as sections; `forks` stays a count, as in repos_metadata.json
+sections = ('commits', 'issues', 'prs')
+
+def index_path_for(path):
+    return os.path.splitext(path)[0] + '.index.json'
+
+# -------------------------------------------------------------------------
+# Writing
+# -------------------------------------------------------------------------
+
+def _line(value):
+    return json.dumps(value, ensure_ascii=False).encode('utf-8') + b'\n'
+
+# Write (header, {section: items}) pairs to `path` and its sidecar index.
+# Both go through .tmp files; the index is replaced last and records the
+# pack's size, so a reader never pairs an index with the wrong pack.
+def write_pack(repos, path=pack_path):
+    index = {}
+    with open(path + '.tmp', 'wb') as f:
+        for header, repo_sections in repos:
+            full_name = header['full_name']
+            start = f.tell()
+            f.write(_line(header))
+            entry = {'header': [start, f.tell() - start], 'sections': {}}
+
+            for name, items in repo_sections.items():
+                offset, count, offsets = f.tell(), 0, []
+                for item in items:
+                    if count % index_every == 0:
+                        offsets.append([count, f.tell()])
+                    f.write(_line(item))
+                    count += 1
+                entry['sections'][name] = {
+                    'offset': offset, 'bytes': f.tell() - offset, 'items': count, 'index': offsets,
+                }
+            index[full_name] = entry
+        size = f.tell()
+
+    index_path = index_path_for(path)
+    os.replace(path + '.tmp', path)
+    with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'version': index_version, 'bytes': size, 'repos': index}, f)
+    os.replace(index_path + '.tmp', index_path)
+    return len(index)
+
+def _split(entry):
+    split = {name: entry[name] for name in sections if isinstance(entry.get(name), list)}
+    return {key: value for key, value in entry.items() if key not in split}, split
+
+# Convert a repos_metadata.json array into the packed form
+def convert(source=source_path, path=pack_path):
+    with open(source, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    return write_pack((_split(entry) for entry in entries if entry.get('full_name')), path)
+
+# Pack the scraper's output (summary plus per-repo artifacts) without
+# loading any artifact whole
+def pack_data_dir(root=data_root, path=pack_path):
+    def repos():
+        for header in iter_items(root, 'database_summary.jsonl'):
+            full_name = header.get('full_name')
+            repo_dir = os.path.join(root, full_name.split('/')[-1]) if full_name else None
+            if repo_dir is None or not os.path.isdir(repo_dir):
+                continue
+            yield header, {
+                name: iter_items(repo_dir, f'{name}.jsonl')
+                for name in sections if artifact_path(repo_dir, f'{name}.jsonl')
+            }
+    return write_pack(repos(), path)
+
+# -------------------------------------------------------------------------
+# Reading
+# -------------------------------------------------------------------------
+
+class MetadataReader:
+    """Random access to a packed repos_metadata file through mmap.
+
+    Lookups accept `owner/repo` or the bare repo name. Only the sidecar
+    index is loaded up front; headers and section items are decoded from
+    the mapped pack on demand.
+
+    Args:
+        path (str, optional): Pack file written by `write_pack`.
+
+    Raises:
+        ValueError: If the index does not match the pack.
+    """
+    def __init__(self, path: str = pack_path):
+        self.path = path
+        self.index_path = index_path_for(path)
+        self.mtime = os.stat(self.index_path).st_mtime
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != index_version:
+            raise ValueError(f"Unsupported metadata index version in {self.index_path}")
+
+        self.repos: dict = index['repos']
+        self.names = {full_name.split('/')[-1]: full_name for full_name in self.repos}
+
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        if size != index['bytes']:
+            self.file.close()
+            raise ValueError(f"{self.index_path} does not match {path}; rebuild it")
+        # mmap can't map an empty file
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def __len__(self) -> int:
+        return len(self.repos)
+
+    def __contains__(self, repo: str) -> bool:
+        return self.resolve(repo) is not None
+
+    def is_stale(self) -> bool:
+        """Whether the index has been rewritten since this reader opened it."""
+        try:
+            return os.stat(self.index_path).st_mtime != self.mtime
+        except FileNotFoundError:
+            return True
+
+    def resolve(self, repo: str) -> str | None:
+        """Full name for `owner/repo` or a bare repo name, or None."""
+        repo = repo.strip('/')
+        return repo if repo in self.repos else self.names.get(repo.split('/')[-1])
+
+    def _entry(self, repo: str) -> dict:
+        full_name = self.resolve(repo)
+        if full_name is None:
+            raise KeyError(repo)
+        return self.repos[full_name]
+
+    def header(self, repo: str) -> dict:
+        """The repo's scalar fields (name, stars, license, topics, ...)."""
+        offset, length = self._entry(repo)['header']
+        return json.loads(self.map[offset:offset + length])
+
+    def counts(self, repo: str) -> dict[str, int]:
+        """Number of items in each of the repo's sections."""
+        return {name: section['items'] for name, section in self._entry(repo)['sections'].items()}
+
+    def iter_lines(self, repo: str, section: str, start: int = 0):
+        """Yields the raw JSON line of each item in a section, from item `start`."""
+        if start < 0:
+            raise ValueError("start must be 0 or more")
+        entry = self._entry(repo)['sections'].get(section)
+        if entry is None or start >= entry['items']:
+            return
+        end = entry['offset'] + entry['bytes']
+
+        # Jump to the nearest indexed item at or before `start`
+        position, skip = entry['offset'], start
+        for item_number, item_offset in entry['index']:
+            if item_number > start:
+                break
+            position, skip = item_offset, start - item_number
+
+        while position < end:
+            stop = self.map.find(b'\n', position, end) + 1
+            if skip:
+                skip -= 1
+            else:
+                yield self.map[position:stop]
+            position = stop
+
+    def iter_section(self, repo: str, section: str, start: int = 0):
+        """Yields the decoded items of a section, from item `start`."""
+        for line in self.iter_lines(repo, section, start):
+            yield json.loads(line)
+
+    def section(self, repo: str, section: str, start: int = 0, num: int | None = None) -> list:
+        """Up to `num` items of a section, from item `start`."""
+        items = []
+        for item in self.iter_section(repo, section, start):
+            if num is not None and len(items) >= num:
+                break
+            items.append(item)
+        return items
+
+    def get(self, repo: str) -> dict:
+        """The full repo entry, as it appeared in repos_metadata.json."""
+        entry = self.header(repo)
+        for name in self._entry(repo)['sections']:
+            entry[name] = list(self.iter_section(repo, name))
+        return entry
+
+# Main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the indexed repos_metadata pack.")
+    parser.add_argument('source', nargs='?', default=source_path,
+                        help="repos_metadata.json to convert, or a scraper data directory to pack")
+    parser.add_argument('--output', default=pack_path, help="Pack file; the index is written next to it")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.source):
+        count = pack_data_dir(args.source, args.output)
+    else:
+        count = convert(args.source, args.output)
+    print(f"Packed {count} repos into {os.path.relpath(args.output)} (index {os.path.relpath(index_path_for(args.output))})")
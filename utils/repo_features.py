@@ -0,0 +1,230 @@
+import os
+import json
+import hashlib
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from jsonl_store import artifact_path, iter_items
+
+# -------------------------------------------------------------------------
+# Repository health features (commit cadence, issue latency, PR merge rate,
+# bus factor, fork growth) computed with NumPy, cached per repo
+# -------------------------------------------------------------------------
+#
+# Features for a repo are cached in data/<repo>/features.json together with
+# a hash of the artifacts they came from, so they are only recomputed when
+# the scraped data changes. Dates are measured relative to the repo's last
+# observed activity, so the same data always gives the same features.
+
+data_root = os.getenv('SCRAPER_DATA_DIR', os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data')))
+features_name = 'features.json'
+features_version = 1
+
+source_artifacts = ('commits.jsonl', 'issues.jsonl', 'prs.jsonl', 'forks.jsonl')
+day = 86400.0
+
+# Hash of the repo's artifacts and summary entry; changes whenever either does
+def source_hash(repo_dir, summary=None):
+    digest = hashlib.sha256(f"v{features_version}".encode())
+    for name in source_artifacts:
+        path = artifact_path(repo_dir, name)
+        if path is None:
+            continue
+        digest.update(os.path.basename(path).encode())
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    digest.update(json.dumps(summary, sort_keys=True).encode())
+    return digest.hexdigest()
+
+# ISO-8601 strings (None allowed) -> float seconds since the epoch, NaN for missing
+def to_seconds(values):
+    stamps = np.array([v[:19] if v else 'NaT' for v in values], dtype='datetime64[s]')
+    seconds = stamps.astype('int64').astype(float)
+    seconds[np.isnat(stamps)] = np.nan
+    return seconds
+
+def _columns(repo_dir, name, fields):
+    rows = [[item.get(field) for field in fields] for item in iter_items(repo_dir, name)]
+    return [list(column) for column in zip(*rows)] if rows else [[] for _ in fields]
+
+def _median(values):
+    values = values[~np.isnan(values)]
+    return float(np.median(values)) if values.size else None
+
+def _percentile(values, q):
+    values = values[~np.isnan(values)]
+    return float(np.percentile(values, q)) if values.size else None
+
+def _round(value, digits=3):
+    return round(value, digits) if isinstance(value, float) else value
+
+def commit_features(dates, authors, as_of):
+    times = np.sort(to_seconds(dates))
+    times = times[~np.isnan(times)]
+    if not times.size:
+        return {'commits': 0}
+
+    span_weeks = max((times[-1] - times[0]) / (7 * day), 1.0)
+    weekly = np.bincount(((times - times[0]) // (7 * day)).astype(int))
+    gaps = np.diff(times) / day
+
+    names, counts = np.unique(np.array([a or '' for a in authors]), return_counts=True)
+    shares = np.sort(counts)[::-1] / counts.sum()
+    bus_factor = int(np.searchsorted(np.cumsum(shares), 0.5) + 1)
+
+    return {
+        'commits': int(times.size),
+        'commits_per_week': times.size / span_weeks,
+        'commit_weekly_cv': float(weekly.std() / weekly.mean()) if weekly.mean() else None,
+        'median_days_between_commits': _median(gaps) if gaps.size else None,
+        'days_since_last_commit': (as_of - times[-1]) / day,
+        'commits_last_90_days': int((times >= as_of - 90 * day).sum()),
+        'active_weeks_ratio': float((weekly > 0).mean()),
+        'contributors': int(names.size),
+        'bus_factor': bus_factor,
+        'top_contributor_share': float(shares[0]),
+    }
+
+# The issues endpoint also lists pull requests; `pr_numbers` are left out
+def issue_features(created, closed, states, numbers, pr_numbers, as_of):
+    keep = np.array([n not in pr_numbers for n in numbers], dtype=bool)
+    opened = to_seconds(created)[keep] if keep.size else np.array([])
+    closed_at = to_seconds(closed)[keep] if keep.size else np.array([])
+    if not opened.size:
+        return {'issues': 0}
+
+    latency = (closed_at - opened) / day
+    open_count = int(np.sum(np.array(states)[keep] == 'open'))
+    return {
+        'issues': int(opened.size),
+        'open_issue_ratio': open_count / opened.size,
+        'median_issue_close_days': _median(latency),
+        'p90_issue_close_days': _percentile(latency, 90),
+        'issues_last_90_days': int((opened >= as_of - 90 * day).sum()),
+    }
+
+def pr_features(created, closed, merged, as_of):
+    opened = to_seconds(created)
+    if not opened.size:
+        return {'prs': 0}
+
+    closed_at = to_seconds(closed)
+    merged_at = to_seconds(merged)
+    finished = ~np.isnan(closed_at)
+    was_merged = ~np.isnan(merged_at)
+    return {
+        'prs': int(opened.size),
+        'pr_merge_rate': float(was_merged.sum() / finished.sum()) if finished.any() else None,
+        'median_pr_merge_days': _median((merged_at - opened) / day),
+        'open_pr_ratio': float((~finished).mean()),
+        'prs_last_90_days': int((opened >= as_of - 90 * day).sum()),
+    }
+
+def fork_features(created, as_of):
+    times = to_seconds(created)
+    times = times[~np.isnan(times)]
+    if not times.size:
+        return {'scraped_forks': 0}
+
+    recent = int((times >= as_of - 90 * day).sum())
+    previous = int(((times >= as_of - 180 * day) & (times < as_of - 90 * day)).sum())
+    return {
+        'scraped_forks': int(times.size),
+        'forks_last_90_days': recent,
+        'fork_growth_90d': (recent - previous) / previous if previous else None,
+    }
+
+def compute_features(repo_dir, summary=None):
+    summary = summary or {}
+    commit_dates, commit_authors = _columns(repo_dir, 'commits.jsonl', ('date', 'author'))
+    issue_created, issue_closed, issue_states, issue_numbers = _columns(
+        repo_dir, 'issues.jsonl', ('created_at', 'closed_at', 'state', 'number'))
+    pr_created, pr_closed, pr_merged, pr_numbers = _columns(
+        repo_dir, 'prs.jsonl', ('created_at', 'closed_at', 'merged_at', 'number'))
+    (fork_created,) = _columns(repo_dir, 'forks.jsonl', ('created_at',))
+
+    # Reference time: the latest activity seen, so features don't drift with the clock
+    observed = to_seconds(commit_dates + issue_created + issue_closed + pr_created + fork_created
+                          + [summary.get('pushed_at')])
+    as_of = float(np.nanmax(observed)) if np.any(~np.isnan(observed)) else 0.0
+    created = to_seconds([summary.get('created_at')])[0]
+
+    features = {
+        'stars': summary.get('stars'),
+        'forks': summary.get('forks'),
+        'watchers': summary.get('watchers'),
+        'age_days': (as_of - created) / day if not np.isnan(created) else None,
+        'has_license': bool(summary.get('license')),
+        'topics': len(summary.get('topics') or []),
+        'readme_bytes': os.path.getsize(os.path.join(repo_dir, 'readme.md'))
+        if os.path.exists(os.path.join(repo_dir, 'readme.md')) else 0,
+    }
+    features.update(commit_features(commit_dates, commit_authors, as_of))
+    features.update(issue_features(issue_created, issue_closed, issue_states, issue_numbers, set(pr_numbers), as_of))
+    features.update(pr_features(pr_created, pr_closed, pr_merged, as_of))
+    features.update(fork_features(fork_created, as_of))
+    return {key: _round(value) for key, value in features.items()}
+
+def _load_cached(repo_dir, digest):
+    path = os.path.join(repo_dir, features_name)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        cached = json.load(f)
+    return cached if cached.get('source_hash') == digest else None
+
+# Cached features for one repo, recomputing them if the source data changed
+def repo_features(repo_dir, summary=None):
+    digest = source_hash(repo_dir, summary)
+    cached = _load_cached(repo_dir, digest)
+    if cached:
+        return cached
+
+    result = {
+        'repo': (summary or {}).get('full_name') or os.path.basename(repo_dir),
+        'source_hash': digest,
+        'features': compute_features(repo_dir, summary),
+    }
+    path = os.path.join(repo_dir, features_name)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    os.replace(path + '.tmp', path)
+    return result
+
+# Repo directory name -> summary entry
+def load_summaries(root=data_root):
+    return {entry['full_name'].split('/')[-1]: entry
+            for entry in iter_items(root, 'database_summary.jsonl') if entry.get('full_name')}
+
+def _task(args):
+    return repo_features(*args)
+
+# Features for every repo under `root`, spread across a process pool
+def build_all(root=data_root, workers=None):
+    summaries = load_summaries(root)
+    tasks = [
+        (entry.path, summaries.get(entry.name))
+        for entry in sorted(os.scandir(root), key=lambda e: e.name)
+        if entry.is_dir() and not entry.name.startswith('.')
+        and any(artifact_path(entry.path, name) for name in source_artifacts)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_task, tasks))
+
+# Main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compute repository health features for every scraped repo.")
+    parser.add_argument('data_dir', nargs='?', default=data_root)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (defaults to CPU count)")
+    parser.add_argument('--json', action='store_true', help="Print the features as JSON")
+    args = parser.parse_args()
+
+    results = build_all(args.data_dir, args.workers)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            features = result['features']
+            print(f"{result['repo']}: {features.get('commits', 0)} commits, bus factor {features.get('bus_factor')}, "
+                  f"PR merge rate {features.get('pr_merge_rate')}")
@@ -0,0 +1,312 @@
+import os
+import sys
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from jsonl_store import artifact_path, iter_items
+
+# -------------------------------------------------------------------------
+# Indexed SQLite store of scraped repository metadata and activity
+# -------------------------------------------------------------------------
+#
+# Built from the scraper's output so questions like "how many issues were
+# closed in the last 90 days" are answered with one indexed query instead of
+# loading whole artifacts. Ingest is incremental: an artifact is re-read only
+# when its size or modification time has changed since the last ingest.
+
+data_root = os.getenv('SCRAPER_DATA_DIR', os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data')))
+store_path = os.getenv('REPO_STORE_PATH', os.path.join(data_root, 'repo_store.sqlite'))
+
+batch_size = 1000
+
+schema = """
+CREATE TABLE IF NOT EXISTS repos (
+    repo TEXT PRIMARY KEY, description TEXT, language TEXT, license TEXT,
+    stars INTEGER, forks INTEGER, watchers INTEGER, topics TEXT,
+    created_at TEXT, updated_at TEXT, pushed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS commits (
+    repo TEXT, sha TEXT, author TEXT, date TEXT, message TEXT,
+    PRIMARY KEY (repo, sha)
+);
+CREATE INDEX IF NOT EXISTS commits_date ON commits (repo, date);
+CREATE INDEX IF NOT EXISTS commits_author ON commits (repo, author);
+
+-- Issues and pull requests; the issues endpoint also lists pull requests,
+-- so queries on kind = 'issue' exclude numbers that have a 'pr' row
+CREATE TABLE IF NOT EXISTS items (
+    repo TEXT, kind TEXT, id INTEGER, number INTEGER, title TEXT, author TEXT,
+    state TEXT, comments INTEGER, created_at TEXT, closed_at TEXT, merged_at TEXT,
+    PRIMARY KEY (repo, kind, id)
+);
+CREATE INDEX IF NOT EXISTS items_created ON items (repo, kind, created_at);
+CREATE INDEX IF NOT EXISTS items_closed ON items (repo, kind, closed_at);
+CREATE INDEX IF NOT EXISTS items_state ON items (repo, kind, state);
+CREATE INDEX IF NOT EXISTS items_author ON items (repo, kind, author);
+CREATE INDEX IF NOT EXISTS items_number ON items (repo, kind, number);
+
+CREATE TABLE IF NOT EXISTS labels (
+    repo TEXT, kind TEXT, id INTEGER, label TEXT
+);
+CREATE INDEX IF NOT EXISTS labels_label ON labels (repo, kind, label, id);
+CREATE INDEX IF NOT EXISTS labels_item ON labels (repo, kind, id);
+
+CREATE TABLE IF NOT EXISTS forks (
+    repo TEXT, id INTEGER, full_name TEXT, created_at TEXT,
+    PRIMARY KEY (repo, id)
+);
+CREATE INDEX IF NOT EXISTS forks_created ON forks (repo, created_at);
+
+-- Size and mtime of each ingested artifact, to skip unchanged files
+CREATE TABLE IF NOT EXISTS ingested (
+    path TEXT PRIMARY KEY, size INTEGER, mtime REAL, items INTEGER
+);
+"""
+
+def connect(path=store_path, read_only=False):
+    if read_only:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(schema)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+# -------------------------------------------------------------------------
+# Ingest
+# -------------------------------------------------------------------------
+
+def _batched(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _changed(conn, path):
+    stat = os.stat(path)
+    row = conn.execute('SELECT size, mtime FROM ingested WHERE path = ?', (path,)).fetchone()
+    return row is None or row['size'] != stat.st_size or row['mtime'] != stat.st_mtime
+
+def _mark(conn, path, items):
+    stat = os.stat(path)
+    conn.execute('INSERT OR REPLACE INTO ingested VALUES (?, ?, ?, ?)', (path, stat.st_size, stat.st_mtime, items))
+
+def _ingest_commits(conn, repo, directory, name):
+    conn.execute('DELETE FROM commits WHERE repo = ?', (repo,))
+    count = 0
+    for batch in _batched(iter_items(directory, name)):
+        conn.executemany('INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?, ?)', [
+            (repo, c.get('sha'), c.get('author'), c.get('date'), (c.get('message') or '').split('\n')[0])
+            for c in batch
+        ])
+        count += len(batch)
+    return count
+
+def _ingest_items(conn, repo, directory, name, kind):
+    conn.execute('DELETE FROM items WHERE repo = ? AND kind = ?', (repo, kind))
+    conn.execute('DELETE FROM labels WHERE repo = ? AND kind = ?', (repo, kind))
+    count = 0
+    for batch in _batched(iter_items(directory, name)):
+        conn.executemany('INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', [
+            (repo, kind, i.get('id'), i.get('number'), i.get('title'), i.get('user'), i.get('state'),
+             i.get('comments'), i.get('created_at'), i.get('closed_at'), i.get('merged_at'))
+            for i in batch
+        ])
+        conn.executemany('INSERT INTO labels VALUES (?, ?, ?, ?)', [
+            (repo, kind, i.get('id'), label) for i in batch for label in i.get('labels') or []
+        ])
+        count += len(batch)
+    return count
+
+def _ingest_forks(conn, repo, directory, name):
+    conn.execute('DELETE FROM forks WHERE repo = ?', (repo,))
+    count = 0
+    for batch in _batched(iter_items(directory, name)):
+        conn.executemany('INSERT OR REPLACE INTO forks VALUES (?, ?, ?, ?)', [
+            (repo, f.get('id'), f.get('full_name'), f.get('created_at')) for f in batch
+        ])
+        count += len(batch)
+    return count
+
+# Artifact -> ingest function
+ingesters = {
+    'commits.jsonl': _ingest_commits,
+    'issues.jsonl': lambda conn, repo, directory, name: _ingest_items(conn, repo, directory, name, 'issue'),
+    'prs.jsonl': lambda conn, repo, directory, name: _ingest_items(conn, repo, directory, name, 'pr'),
+    'forks.jsonl': _ingest_forks,
+}
+
+def _ingest_summary(conn, root):
+    names = {}
+    path = artifact_path(root, 'database_summary.jsonl')
+    if path is None:
+        return names
+    for entry in iter_items(root, 'database_summary.jsonl'):
+        full_name = entry.get('full_name')
+        if not full_name:
+            continue
+        names[full_name.split('/')[-1]] = full_name
+        conn.execute('INSERT OR REPLACE INTO repos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+            full_name, entry.get('description'), entry.get('language'), entry.get('license'),
+            entry.get('stars'), entry.get('forks'), entry.get('watchers'), json.dumps(entry.get('topics') or []),
+            entry.get('created_at'), entry.get('updated_at'), entry.get('pushed_at'),
+        ))
+    return names
+
+# Ingest every repo directory under `root`, skipping unchanged artifacts
+def ingest(root=data_root, path=store_path):
+    conn = connect(path)
+    report = {}
+    try:
+        with conn:
+            names = _ingest_summary(conn, root)
+
+        for entry in sorted(os.scandir(root), key=lambda e: e.name):
+            if not entry.is_dir() or entry.name.startswith('.'):
+                continue
+            repo = names.get(entry.name, entry.name)
+            for name, ingest_artifact in ingesters.items():
+                artifact = artifact_path(entry.path, name)
+                if artifact is None or not _changed(conn, artifact):
+                    continue
+                # One transaction per artifact, so a crash never leaves half a file ingested
+                with conn:
+                    count = ingest_artifact(conn, repo, entry.path, name)
+                    _mark(conn, artifact, count)
+                report[f"{repo}/{name}"] = count
+    finally:
+        conn.close()
+    return report
+
+# -------------------------------------------------------------------------
+# Queries (each returns a compact aggregate, never raw artifacts)
+# -------------------------------------------------------------------------
+
+kinds = ('commits', 'issues', 'prs', 'forks')
+buckets = {'day': '%Y-%m-%d', 'week': '%Y-W%W', 'month': '%Y-%m', 'year': '%Y'}
+
+# Kind -> (table, kind filter, {date field name -> column}, author column)
+_sources = {
+    'commits': ('commits', None, {'created': 'date'}, 'author'),
+    'issues': ('items', 'issue', {'created': 'created_at', 'closed': 'closed_at'}, 'author'),
+    'prs': ('items', 'pr', {'created': 'created_at', 'closed': 'closed_at', 'merged': 'merged_at'}, 'author'),
+    'forks': ('forks', None, {'created': 'created_at'}, None),
+}
+
+def _since(since=None, last_days=None):
+    if last_days is not None:
+        return (datetime.now(timezone.utc) - timedelta(days=last_days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    return since
+
+# owner/repo for a bare repo name, looked up once in the (small) repos
+# table; names without a summary entry are stored bare and pass through
+def resolve_repo(conn, repo):
+    if not repo:
+        return None
+    repo = repo.strip('/')
+    if '/' in repo:
+        return repo
+    row = conn.execute("SELECT repo FROM repos WHERE substr(repo, instr(repo, '/') + 1) = ? ORDER BY repo",
+                       (repo,)).fetchone()
+    return row['repo'] if row else repo
+
+# Build FROM/WHERE for a kind and its filters; raises ValueError on bad input
+def _where(kind, repo=None, state=None, author=None, label=None, date_field='created',
+           since=None, until=None, dated=False):
+    if kind not in _sources:
+        raise ValueError(f"kind must be one of {', '.join(kinds)}")
+    table, item_kind, dates, author_column = _sources[kind]
+    if date_field not in dates:
+        raise ValueError(f"date_field for {kind} must be one of {', '.join(dates)}")
+    column = dates[date_field]
+
+    clauses, params = [], []
+    if item_kind:
+        clauses.append('t.kind = ?')
+        params.append(item_kind)
+    if item_kind == 'issue':
+        clauses.append("NOT EXISTS (SELECT 1 FROM items p WHERE p.repo = t.repo AND p.kind = 'pr' AND p.number = t.number)")
+    if repo:
+        # Equality keeps the (repo, ...) indexes usable; see resolve_repo
+        clauses.append('t.repo = ?')
+        params.append(repo)
+    if state:
+        if table != 'items':
+            raise ValueError("state only applies to issues and prs")
+        clauses.append('t.state = ?')
+        params.append(state)
+    if author:
+        if author_column is None:
+            raise ValueError(f"author does not apply to {kind}")
+        clauses.append(f't.{author_column} = ?')
+        params.append(author)
+    if label:
+        if table != 'items':
+            raise ValueError("label only applies to issues and prs")
+        clauses.append('EXISTS (SELECT 1 FROM labels l WHERE l.repo = t.repo AND l.kind = t.kind AND l.id = t.id AND l.label = ?)')
+        params.append(label)
+    if since:
+        clauses.append(f't.{column} >= ?')
+        params.append(since)
+    if until:
+        clauses.append(f't.{column} < ?')
+        params.append(until)
+    if since or until or dated:
+        clauses.append(f't.{column} IS NOT NULL')
+
+    where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+    return f'FROM {table} t{where}', params, column, author_column
+
+def count(conn, kind, repo=None, state=None, author=None, label=None, date_field='created',
+          since=None, until=None, last_days=None):
+    since = _since(since, last_days)
+    source, params, _, _ = _where(kind, resolve_repo(conn, repo), state, author, label, date_field, since, until)
+    total = conn.execute(f'SELECT COUNT(*) {source}', params).fetchone()[0]
+    return {'kind': kind, 'count': total, 'since': since, 'until': until}
+
+def activity(conn, kind, bucket='month', repo=None, state=None, author=None, label=None,
+             date_field='created', since=None, until=None, last_days=None):
+    if bucket not in buckets:
+        raise ValueError(f"bucket must be one of {', '.join(buckets)}")
+    since = _since(since, last_days)
+    source, params, column, _ = _where(kind, resolve_repo(conn, repo), state, author, label, date_field, since, until, dated=True)
+    rows = conn.execute(
+        f"SELECT strftime('{buckets[bucket]}', t.{column}) AS period, COUNT(*) AS n {source} "
+        "GROUP BY period ORDER BY period",
+        params,
+    ).fetchall()
+    return {'kind': kind, 'bucket': bucket, 'series': [[row['period'], row['n']] for row in rows]}
+
+def top_contributors(conn, kind='commits', repo=None, state=None, label=None, date_field='created',
+                     since=None, until=None, last_days=None, n=10):
+    since = _since(since, last_days)
+    source, params, _, author_column = _where(kind, resolve_repo(conn, repo), state, None, label, date_field, since, until)
+    if author_column is None:
+        raise ValueError(f"{kind} have no author")
+    rows = conn.execute(
+        f"SELECT t.{author_column} AS author, COUNT(*) AS n {source} GROUP BY author ORDER BY n DESC LIMIT ?",
+        params + [n],
+    ).fetchall()
+    return {'kind': kind, 'contributors': [[row['author'], row['n']] for row in rows]}
+
+def repo_overview(conn):
+    repos = {row['repo']: {key: row[key] for key in ('language', 'stars', 'forks', 'pushed_at')}
+             for row in conn.execute('SELECT * FROM repos ORDER BY repo')}
+    for kind in kinds:
+        source, params, _, _ = _where(kind)
+        for row in conn.execute(f'SELECT t.repo AS repo, COUNT(*) AS n {source} GROUP BY t.repo', params):
+            repos.setdefault(row['repo'], {}).setdefault('scraped', {})[kind] = row['n']
+    return {'repos': repos}
+
+# Main
+if __name__ == '__main__':
+    root = sys.argv[1] if len(sys.argv) > 1 else data_root
+    report = ingest(root, os.getenv('REPO_STORE_PATH', os.path.join(root, 'repo_store.sqlite')))
+    for artifact, items in report.items():
+        print(f"Ingested {artifact} ({items} items)")
+    print(f"{len(report)} artifacts ingested" if report else "Store is up to date")
@@ -0,0 +1,226 @@
+import os
+import sys
+import copy
+import json
+import time
+import shutil
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from github_scraper import (
+    data_root, endpoint_files, parse_github_url, ensure_repo_dir, append_summary,
+    fetch_repo_metadata, fetch_readme, iter_pages, make_session, write_file_if_missing,
+    RateLimiter,
+)
+from jsonl_store import JsonlWriter, artifact_path, iter_jsonl
+from metadata_index import MetadataReader, index_path_for, pack_data_dir
+
+# -------------------------------------------------------------------------
+# Multi-repo scrape orchestrator with per-repo / per-endpoint checkpoints
+# -------------------------------------------------------------------------
+
+default_checkpoint = os.path.join(data_root, 'scrape_checkpoint.json')
+
+# Progress for every repo. Workers change the state only while holding
+# `lock`; saves write a snapshot taken under it. Per-page saves are
+# debounced to one every `save_interval` seconds (spooled pages newer than
+# the last save are refetched after a crash); milestones force a save.
+class Checkpoint:
+    def __init__(self, path, save_interval=2.0):
+        self.path = path
+        self.lock = threading.Lock()
+        self.save_interval = save_interval
+        self.state = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        self._saved_at = 0.0
+        self._version = 0
+        self._written = 0
+        self._write_lock = threading.Lock()
+
+    def repo(self, full_name):
+        with self.lock:
+            return self.state.setdefault(full_name, {'status': 'pending', 'endpoints': {}})
+
+    def save(self, force=False):
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self._saved_at < self.save_interval:
+                return
+            self._saved_at = now
+            self._version += 1
+            version, snapshot = self._version, copy.deepcopy(self.state)
+
+        with self._write_lock:
+            # A newer snapshot may have been written while this one waited
+            if version < self._written:
+                return
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(self.path + '.tmp', self.path)
+            self._written = version
+
+# Repo list: lines of URLs or owner/repo, or a JSON / JSONL list with full_name fields
+def load_repo_list(path):
+    if path.endswith('.jsonl') and os.path.exists(index_path_for(path)):
+        # A repos_metadata pack; its index already lists every full_name
+        with MetadataReader(path) as reader:
+            names = list(reader.repos)
+    elif path.endswith('.jsonl'):
+        names = [entry['full_name'] for entry in iter_jsonl(path)]
+    elif path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        names = [entry['full_name'] if isinstance(entry, dict) else entry for entry in entries]
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            names = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    repos = []
+    for name in names:
+        if '://' in name:
+            repos.append(parse_github_url(name))
+        else:
+            owner, repo = name.strip('/').split('/')[:2]
+            repos.append((owner, repo))
+    return repos
+
+# Fetch one endpoint, spooling each page to disk so a restart skips it
+def scrape_endpoint(session, owner, repo, repo_dir, filename, limiter, checkpoint, state, stats):
+    endpoint, mapper = endpoint_files[filename]
+    path = os.path.join(repo_dir, filename)
+    with checkpoint.lock:
+        progress = state['endpoints'].setdefault(filename, {'done': False, 'pages': [], 'last': None})
+        done = progress['done'] or artifact_path(repo_dir, filename) is not None
+        progress['done'] = done
+        skip_pages, last = list(progress['pages']), progress['last']
+    if done:
+        return
+
+    pages_dir = os.path.join(repo_dir, '.pages', endpoint)
+    os.makedirs(pages_dir, exist_ok=True)
+
+    meta = {}
+    for page, batch in iter_pages(session, owner, repo, endpoint, limiter, meta=meta,
+                                  skip_pages=skip_pages, last=last):
+        page_path = os.path.join(pages_dir, f'{page}.jsonl')
+        with open(page_path + '.tmp', 'w', encoding='utf-8') as f:
+            for item in batch:
+                f.write(json.dumps(mapper(item), ensure_ascii=False) + '\n')
+        os.replace(page_path + '.tmp', page_path)
+
+        with checkpoint.lock:
+            progress['pages'].append(page)
+            progress['last'] = meta.get('last')
+        checkpoint.save()
+        stats['pages'] += 1
+        stats['items'] += len(batch)
+
+    if not meta.get('complete'):
+        raise RuntimeError(f"{endpoint} stopped early; it will resume from page checkpoints")
+
+    # Assemble the spooled pages in order, one page in memory at a time
+    with checkpoint.lock:
+        pages = sorted(progress['pages'])
+    with JsonlWriter(path) as writer:
+        for page in pages:
+            writer.write_many(iter_jsonl(os.path.join(pages_dir, f'{page}.jsonl')))
+    print(f"Wrote {filename}")
+    shutil.rmtree(pages_dir, ignore_errors=True)
+    if not os.listdir(os.path.dirname(pages_dir)):
+        os.rmdir(os.path.dirname(pages_dir))
+
+    with checkpoint.lock:
+        progress['done'] = True
+    checkpoint.save(force=True)
+
+def scrape_repo(session, owner, repo, limiter, checkpoint):
+    full_name = f"{owner}/{repo}"
+    state = checkpoint.repo(full_name)
+    stats = {'repo': full_name, 'pages': 0, 'items': 0, 'error': None}
+    with checkpoint.lock:
+        status, default_branch = state['status'], state.get('default_branch')
+    if status == 'done':
+        stats['skipped'] = True
+        return stats
+
+    start = time.perf_counter()
+    try:
+        repo_dir = ensure_repo_dir(repo)
+        if not default_branch:
+            summary = fetch_repo_metadata(session, owner, repo, limiter)
+            append_summary(summary)
+            default_branch = summary['default_branch']
+            with checkpoint.lock:
+                state['default_branch'] = default_branch
+            checkpoint.save(force=True)
+
+        for filename in endpoint_files:
+            scrape_endpoint(session, owner, repo, repo_dir, filename, limiter, checkpoint, state, stats)
+
+        write_file_if_missing(fetch_readme(session, owner, repo, default_branch),
+                              os.path.join(repo_dir, 'readme.md'))
+        with checkpoint.lock:
+            state['status'] = 'done'
+    except Exception as e:
+        with checkpoint.lock:
+            state['status'] = 'failed'
+        stats['error'] = str(e)
+    finally:
+        checkpoint.save(force=True)
+
+    stats['elapsed'] = time.perf_counter() - start
+    return stats
+
+def print_report(results, elapsed, limiter):
+    scraped = [r for r in results if not r.get('skipped')]
+    failed = [r for r in scraped if r['error']]
+    items = sum(r['items'] for r in scraped)
+    pages = sum(r['pages'] for r in scraped)
+
+    print(f"\nRepos: {len(scraped) - len(failed)} scraped, {len(failed)} failed, "
+          f"{len(results) - len(scraped)} already done")
+    print(f"Pages: {pages}  Items: {items}  Requests: {limiter.requests}")
+    if elapsed > 0:
+        print(f"Elapsed: {elapsed:.1f}s  ({len(scraped) / elapsed * 60:.1f} repos/min, "
+              f"{items / elapsed:.1f} items/s, {limiter.requests / elapsed:.2f} requests/s)")
+    for r in failed:
+        print(f"  FAILED {r['repo']}: {r['error']}")
+
+# Main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scrape many GitHub repos with checkpointing.")
+    parser.add_argument('repo_list', help="Text file of repo URLs / owner/repo lines, or a JSON list with full_name")
+    parser.add_argument('--workers', type=int, default=4, help="Repos scraped at once")
+    parser.add_argument('--requests-per-hour', type=int, default=None,
+                        help="Global request budget across all workers (e.g. 5000 with a token)")
+    parser.add_argument('--checkpoint', default=default_checkpoint)
+    parser.add_argument('--retry-failed', action='store_true', help="Retry repos that failed last run")
+    parser.add_argument('--pack', metavar='PATH', default=None,
+                        help="Afterwards, rebuild the indexed repos_metadata pack at PATH from the scraped data")
+    args = parser.parse_args()
+
+    session = make_session(os.getenv('GITHUB_TOKEN'), pool_size=args.workers * 8)
+    limiter = RateLimiter(requests_per_hour=args.requests_per_hour)
+    checkpoint = Checkpoint(args.checkpoint)
+
+    repos = load_repo_list(args.repo_list)
+    if not args.retry_failed:
+        repos = [(o, r) for o, r in repos if checkpoint.repo(f"{o}/{r}")['status'] != 'failed']
+
+    start = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(scrape_repo, session, owner, repo, limiter, checkpoint) for owner, repo in repos]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if not result.get('skipped'):
+                status = f"failed: {result['error']}" if result['error'] else 'done'
+                print(f"{result['repo']}: {result['items']} items in {result['elapsed']:.1f}s ({status})")
+
+    print_report(results, time.perf_counter() - start, limiter)
+    if args.pack:
+        print(f"Packed {pack_data_dir(data_root, args.pack)} repos into {args.pack}")
+    sys.exit(1 if any(r['error'] for r in results) else 0)
@@ -0,0 +1,241 @@
+import os
+import re
+import sys
+import sqlite3
+from jsonl_store import artifact_path, iter_items
+
+# -------------------------------------------------------------------------
+# Full-text BM25 index over scraped READMEs, issues, PRs and commit messages
+# -------------------------------------------------------------------------
+#
+# Documents live in a plain table (indexed by repo and kind, so filters and
+# re-ingest are cheap) backed by an FTS5 inverted index that tokenizes with
+# Porter stemming and ranks with BM25. Like the repository store, the index
+# is built incrementally: an artifact is re-read only when its size or
+# modification time has changed, and only that artifact's documents are
+# replaced (issues are also redone when prs.jsonl changes, since PRs are
+# filtered out of them).
+
+data_root = os.getenv('SCRAPER_DATA_DIR', os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data')))
+index_path = os.getenv('SEARCH_INDEX_PATH', os.path.join(data_root, 'search_index.sqlite'))
+
+batch_size = 1000
+kinds = ('readme', 'issues', 'prs', 'commits')
+
+# BM25 weight of a title match relative to a body match
+title_weight = 3.0
+snippet_tokens = 24
+max_results = 50
+
+schema = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY, repo TEXT, kind TEXT, ref TEXT, date TEXT, title TEXT, body TEXT
+);
+CREATE INDEX IF NOT EXISTS documents_repo ON documents (repo, kind);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, body, content='documents', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+);
+
+-- Keep the inverted index in step with the documents table
+CREATE TRIGGER IF NOT EXISTS documents_insert AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_delete AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+END;
+
+-- Indexed repos by bare name, so a name resolves to one full_name
+CREATE TABLE IF NOT EXISTS repos (
+    repo TEXT PRIMARY KEY, name TEXT
+);
+CREATE INDEX IF NOT EXISTS repos_name ON repos (name);
+
+-- Size and mtime of each indexed artifact, to skip unchanged files
+CREATE TABLE IF NOT EXISTS indexed (
+    path TEXT PRIMARY KEY, size INTEGER, mtime REAL, documents INTEGER
+);
+"""
+
+def connect(path=index_path, read_only=False):
+    if read_only:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(schema)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+# -------------------------------------------------------------------------
+# Ingest
+# -------------------------------------------------------------------------
+
+def _changed(conn, path):
+    stat = os.stat(path)
+    row = conn.execute('SELECT size, mtime FROM indexed WHERE path = ?', (path,)).fetchone()
+    return row is None or row['size'] != stat.st_size or row['mtime'] != stat.st_mtime
+
+def _mark(conn, path, documents):
+    stat = os.stat(path)
+    conn.execute('INSERT OR REPLACE INTO indexed VALUES (?, ?, ?, ?)', (path, stat.st_size, stat.st_mtime, documents))
+
+def _batched(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _insert(conn, rows):
+    count = 0
+    for batch in _batched(rows):
+        conn.executemany('INSERT INTO documents (repo, kind, ref, date, title, body) VALUES (?, ?, ?, ?, ?, ?)', batch)
+        count += len(batch)
+    return count
+
+def _readme_documents(repo, directory, path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        yield (repo, 'readme', 'readme.md', None, 'README', f.read())
+
+def _commit_documents(repo, directory, path):
+    for c in iter_items(directory, 'commits.jsonl'):
+        message = c.get('message') or ''
+        title, _, body = message.partition('\n')
+        yield (repo, 'commits', c.get('sha'), c.get('date'), title, body.strip())
+
+def _item_documents(repo, directory, kind, name, skip=()):
+    for i in iter_items(directory, name):
+        if i.get('number') in skip:
+            continue
+        yield (repo, kind, str(i.get('number')), i.get('created_at'), i.get('title'), i.get('body') or '')
+
+def _pr_documents(repo, directory, path):
+    return _item_documents(repo, directory, 'prs', 'prs.jsonl')
+
+# The issues endpoint also lists pull requests; those are indexed as PRs only
+def _issue_documents(repo, directory, path):
+    prs = {p.get('number') for p in iter_items(directory, 'prs.jsonl')}
+    return _item_documents(repo, directory, 'issues', 'issues.jsonl', prs)
+
+# (artifact, kind, document generator, artifacts it also depends on); PRs
+# come before issues so the issue pass sees the current PR numbers
+sources = (
+    ('readme.md', 'readme', _readme_documents, ()),
+    ('prs.jsonl', 'prs', _pr_documents, ()),
+    ('issues.jsonl', 'issues', _issue_documents, ('prs.jsonl',)),
+    ('commits.jsonl', 'commits', _commit_documents, ()),
+)
+
+def _source_path(directory, name):
+    if name == 'readme.md':
+        path = os.path.join(directory, name)
+        return path if os.path.exists(path) else None
+    return artifact_path(directory, name)
+
+def _repo_names(root):
+    return {entry['full_name'].split('/')[-1]: entry['full_name']
+            for entry in iter_items(root, 'database_summary.jsonl') if entry.get('full_name')}
+
+# Index every repo directory under `root`, skipping unchanged artifacts
+def ingest(root=data_root, path=index_path):
+    conn = connect(path)
+    report = {}
+    try:
+        names = _repo_names(root)
+        for entry in sorted(os.scandir(root), key=lambda e: e.name):
+            if not entry.is_dir() or entry.name.startswith('.'):
+                continue
+            repo = names.get(entry.name, entry.name)
+            paths = {name: _source_path(entry.path, name) for name, _, _, _ in sources}
+            changed = {name for name, path in paths.items() if path and _changed(conn, path)}
+
+            # One transaction per repo, so a crash never leaves a file half
+            # indexed or issues filtered against PRs that were rolled back
+            with conn:
+                conn.execute('INSERT OR IGNORE INTO repos VALUES (?, ?)', (repo, repo.split('/')[-1]))
+                for name, kind, documents, depends in sources:
+                    artifact = paths[name]
+                    if artifact is None or not (name in changed or changed.intersection(depends)):
+                        continue
+                    conn.execute('DELETE FROM documents WHERE repo = ? AND kind = ?', (repo, kind))
+                    count = _insert(conn, documents(repo, entry.path, artifact))
+                    _mark(conn, artifact, count)
+                    report[f"{repo}/{name}"] = count
+        if report:
+            # Merge the index segments left by incremental inserts
+            with conn:
+                conn.execute("INSERT INTO documents_fts (documents_fts) VALUES ('optimize')")
+    finally:
+        conn.close()
+    return report
+
+# -------------------------------------------------------------------------
+# Search
+# -------------------------------------------------------------------------
+
+_phrase = re.compile(r'"([^"]+)"|(\w+)')
+
+# Free text -> FTS5 query: quoted phrases are kept together, other words are
+# matched individually; words are quoted so FTS5 operators can't be injected
+def to_match(text, match_all=False):
+    terms = []
+    for phrase, word in _phrase.findall(text):
+        words = re.findall(r'\w+', phrase or word)
+        if words:
+            terms.append('"' + ' '.join(words) + '"')
+    if not terms:
+        raise ValueError("query has no searchable words")
+    return (' AND ' if match_all else ' OR ').join(terms)
+
+# owner/repo for a bare repo name, so the filter can use documents_repo
+def resolve_repo(conn, repo):
+    repo = repo.strip('/')
+    if '/' in repo:
+        return repo
+    row = conn.execute('SELECT repo FROM repos WHERE name = ? ORDER BY repo', (repo,)).fetchone()
+    return row['repo'] if row else repo
+
+# Top `k` documents by BM25, with a highlighted snippet of each
+def search(conn, query, repo=None, kind=None, k=10, match_all=False):
+    clauses, params = ['documents_fts MATCH ?'], [to_match(query, match_all)]
+    if repo:
+        # Accept either owner/repo or the bare repo name
+        clauses.append('d.repo = ?')
+        params.append(resolve_repo(conn, repo))
+    if kind:
+        selected = [kind] if isinstance(kind, str) else list(kind)
+        unknown = set(selected) - set(kinds)
+        if unknown:
+            raise ValueError(f"kind must be one of {', '.join(kinds)}")
+        clauses.append(f"d.kind IN ({', '.join('?' for _ in selected)})")
+        params += selected
+
+    rows = conn.execute(
+        f"SELECT d.repo, d.kind, d.ref, d.date, d.title, "
+        f"snippet(documents_fts, -1, '**', '**', '…', {snippet_tokens}) AS snippet, "
+        f"bm25(documents_fts, {title_weight}, 1.0) AS score "
+        f"FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+        f"WHERE {' AND '.join(clauses)} ORDER BY score LIMIT ?",
+        params + [max(1, min(k, max_results))],
+    ).fetchall()
+    return {
+        'query': query,
+        'results': [
+            # bm25() is lower-is-better; flip it so higher scores rank first
+            {'repo': row['repo'], 'kind': row['kind'], 'ref': row['ref'], 'date': row['date'],
+             'title': row['title'], 'snippet': row['snippet'], 'score': round(-row['score'], 3)}
+            for row in rows
+        ],
+    }
+
+# Main
+if __name__ == '__main__':
+    root = sys.argv[1] if len(sys.argv) > 1 else data_root
+    report = ingest(root, os.getenv('SEARCH_INDEX_PATH', os.path.join(root, 'search_index.sqlite')))
+    for artifact, documents in report.items():
+        print(f"Indexed {artifact} ({documents} documents)")
+    print(f"{len(report)} artifacts indexed" if report else "Index is up to date")
@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+import gzip
+import argparse
+
+# -------------------------------------------------------------------------
+# Aggregates span and query_trace events from agent and server logs
+# -------------------------------------------------------------------------
+
+# Open plain or gzipped (rotated) log files
+def open_log(path):
+    if '.gz' in os.path.basename(path):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+# Yield every JSON event from the logs in a directory
+def iter_events(log_dir):
+    for name in sorted(os.listdir(log_dir)):
+        if '.log' not in name:
+            continue
+        with open_log(os.path.join(log_dir, name)) as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(event, dict):
+                    yield event
+
+# Nearest-rank percentile of a sorted list
+def percentile(values, pct):
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+def summarise(values):
+    values = sorted(values)
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values) if values else None,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': values[-1] if values else None,
+    }
+
+# Collect per-stage durations, waits and token counts
+def build_report(log_dir):
+    durations, waits, totals, queries = {}, {}, {}, []
+    for event in iter_events(log_dir):
+        if event.get('event') == 'span':
+            name = event.get('name')
+            durations.setdefault(name, []).append(event.get('duration', 0))
+            if event.get('throttle_wait') is not None:
+                waits.setdefault(name, []).append(event['throttle_wait'])
+            stage_totals = totals.setdefault(name, {'errors': 0})
+            for key in ('payload_bytes', 'result_bytes', 'prompt_tokens', 'response_tokens'):
+                if event.get(key) is not None:
+                    stage_totals[key] = stage_totals.get(key, 0) + event[key]
+            if event.get('error'):
+                stage_totals['errors'] += 1
+        elif event.get('event') == 'query_trace':
+            queries.append(event.get('wall_time', 0))
+
+    stages = {}
+    for name, values in durations.items():
+        stages[name] = dict(summarise(values), **totals[name])
+        if name in waits:
+            stages[name]['throttle_wait'] = summarise(waits[name])
+    return {'queries': summarise(queries), 'stages': stages}
+
+def print_report(report):
+    def ms(value):
+        return '-' if value is None else f"{value * 1000:.1f}"
+
+    q = report['queries']
+    print(f"Queries: {q['count']}  p50 {ms(q['p50'])} ms  p95 {ms(q['p95'])} ms  p99 {ms(q['p99'])} ms")
+    print(f"\n{'stage':<32}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}")
+    for name, stage in sorted(report['stages'].items(), key=lambda item: str(item[0])):
+        print(f"{str(name):<32}{stage['count']:>8}{ms(stage['p50']):>10}{ms(stage['p95']):>10}"
+              f"{ms(stage['p99']):>10}{ms(stage['max']):>10}{stage['errors']:>8}")
+        extras = [f"{key}={stage[key]}" for key in ('payload_bytes', 'result_bytes', 'prompt_tokens', 'response_tokens')
+                  if key in stage]
+        if 'throttle_wait' in stage:
+            extras.append(f"throttle p95={ms(stage['throttle_wait']['p95'])} ms")
+        if extras:
+            print(f"{'':<32}{', '.join(extras)}")
+
+# Main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Aggregate span latencies across a log directory.")
+    parser.add_argument('log_dir', nargs='?', default='logs')
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.log_dir):
+        print(f"Log directory {args.log_dir} not found.")
+        sys.exit(1)
+
+    report = build_report(args.log_dir)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)